@@ -0,0 +1,207 @@
+"""
+Caching helpers
+In-process TTL cache used to collapse duplicate API round-trips, a market
+list cache with ETag revalidation, and an on-disk JSON cache that survives
+bot restarts
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache whose entries expire after a fixed TTL
+    
+    When the cache is full, expired entries are purged first and then the
+    oldest entry is evicted.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 5.0):
+        """
+        Initialize TTL cache
+        
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Time-to-live in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.RLock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss or expired entry
+        
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+    
+    def set(self, key: Hashable, value: Any):
+        """
+        Store a value
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                self._evict()
+            self._data[key] = (time.monotonic() + self.ttl, value)
+    
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Drop a cached entry
+        
+        Args:
+            key: Cache key to drop, or None to clear the whole cache
+        """
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+    
+    def _evict(self):
+        """Purge expired entries, then the oldest one if still full"""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+            del self._data[key]
+        if len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class MarketCache:
+    """
+    Last market list seen by a scan loop, with a short TTL and its ETag
+    
+    Within the TTL get() returns the list without asking the client. After
+    that, pass etag to the client so it can answer "not modified" and the
+    previous list (self.markets) is reused as-is.
+    """
+    
+    def __init__(self, ttl: float = 0.5):
+        """
+        Initialize market cache
+        
+        Args:
+            ttl: Time-to-live in seconds
+        """
+        self.ttl = ttl
+        self.markets: Optional[List[Dict]] = None
+        self.etag: Optional[str] = None
+        self._fetched_at = 0.0
+    
+    def get(self) -> Optional[List[Dict]]:
+        """
+        Get the cached market list
+        
+        Returns:
+            Market list, or None if nothing is cached or it has expired
+        """
+        if self.markets is not None and time.monotonic() - self._fetched_at < self.ttl:
+            return self.markets
+        return None
+    
+    def put(self, markets: List[Dict], etag: Optional[str] = None):
+        """
+        Store a freshly fetched (or revalidated) market list
+        
+        Args:
+            markets: Market list
+            etag: ETag the server sent for it, if any
+        """
+        self.markets = markets
+        self.etag = etag
+        self._fetched_at = time.monotonic()
+
+
+class FileCache:
+    """
+    JSON-on-disk cache with a TTL, shared between processes and runs
+    
+    Each key is stored in its own file named after the md5 of the key.
+    Writes go through a temp file + rename so readers never see a torn file.
+    """
+    
+    def __init__(self, cache_dir: str = ".cache", ttl: float = 3600):
+        """
+        Initialize file cache
+        
+        Args:
+            cache_dir: Directory holding the cache files
+            ttl: Time-to-live in seconds
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.md5(key.encode()).hexdigest() + '.json')
+    
+    def get(self, key: str) -> Tuple[Any, bool]:
+        """
+        Read a cached value
+        
+        Args:
+            key: Cache key (e.g. endpoint + params)
+            
+        Returns:
+            Tuple of (value, fresh). value is None if nothing is cached;
+            fresh is False if the entry is older than the TTL.
+        """
+        path = self._path(key)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, 'r') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None, False
+        
+        return payload.get('value'), mtime + self.ttl > time.time()
+    
+    def set(self, key: str, value: Any):
+        """
+        Write a value (must be JSON serializable)
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'key': key, 'timestamp': time.time(), 'value': value}, f)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError) as e:
+            # A broken cache must never break the caller
+            logger.warning("Could not write cache entry %s: %s", key, e)
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
@@ -0,0 +1,17 @@
+"""
+Optional Numba JIT
+Re-exports numba's njit/prange when numba is installed. Without numba the
+decorators are no-ops, so kernels still run (slower) as plain Python.
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and parameterized use)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,94 @@
+"""
+Active-market filter
+Pure functions deciding whether a normalized market is tradeable. Kept free of
+client state and fully annotated so the module can be compiled with mypyc
+(`mypyc shared/python/market_filter.py`); the compiled extension is picked up
+by the normal `import market_filter` and the pure-Python module is the fallback.
+"""
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+# ciso8601 is optional - a C ISO-8601 parser much faster than fromisoformat
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+
+# Valid condition_id: '0x' followed by 64 hex characters
+CONDITION_ID_PATTERN = r'0x[0-9a-fA-F]{64}'
+is_condition_id = re.compile(CONDITION_ID_PATTERN).fullmatch
+
+
+def parse_iso_utc(value: str) -> datetime:
+    """
+    Parse an ISO-8601 timestamp into a timezone-aware datetime
+    
+    Naive timestamps are assumed to be UTC. Raises ValueError/TypeError
+    for values that can't be parsed.
+    """
+    if CISO8601_AVAILABLE:
+        parsed = _parse_datetime(value)
+    else:
+        # fromisoformat() only accepts the 'Z' suffix from Python 3.11
+        parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value[-1] == 'Z' else value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+@lru_cache(maxsize=8192)
+def iso_timestamp(value: str) -> Optional[float]:
+    """
+    Parse an ISO-8601 string to an epoch timestamp, memoized
+    
+    Market dates rarely change between polls, so repeated filter passes
+    mostly hit the cache. Returns None if the value can't be parsed.
+    """
+    try:
+        return parse_iso_utc(value).timestamp()
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def is_tradeable(m: Dict[str, Any], now_ts: float, one_year_ago_ts: float) -> bool:
+    """
+    Check whether a normalized market is tradeable
+    
+    A market is tradeable if it is:
+    1. Not archived
+    2. Accepting orders (or active flag is true)
+    3. Not expired (end date in the future or unknown, and created within the last year)
+    4. Identified by a well-formed condition_id
+    
+    Dates that can't be parsed don't filter the market out.
+    
+    Args:
+        m: Normalized market dictionary
+        now_ts: Current time as an epoch timestamp
+        one_year_ago_ts: Creation cutoff as an epoch timestamp
+        
+    Returns:
+        True if the market should be traded
+    """
+    if m.get('archived', False) or not (m.get('accepting_orders', False) or m.get('active', False)):
+        return False
+    
+    end_date_str = m.get('end_date_iso')
+    if end_date_str and isinstance(end_date_str, str):
+        end_ts = iso_timestamp(end_date_str)
+        if end_ts is not None and end_ts < now_ts:
+            return False
+    
+    # Also check if market is too old (more than 1 year old) even without end date
+    # This catches markets that are clearly expired but don't have end_date set
+    created_str = m.get('created_at') or m.get('createdAt')
+    if created_str and isinstance(created_str, str):
+        created_ts = iso_timestamp(created_str)
+        if created_ts is not None and created_ts < one_year_ago_ts:
+            return False
+    
+    condition_id = m.get('condition_id')
+    return isinstance(condition_id, str) and is_condition_id(condition_id) is not None
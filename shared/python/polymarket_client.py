@@ -5,22 +5,236 @@ Wrapper around py-clob-client for easier usage
 Note: Some methods may need adjustment based on the actual py-clob-client API.
 Check the official documentation: https://github.com/Polymarket/py-clob-client
 """
+import asyncio
+import json
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone, timedelta
+from itertools import compress
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import ApiCreds
 from py_clob_client.constants import POLYGON
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cache import FileCache, TTLCache
+from market_filter import is_condition_id, is_tradeable
+
+# aiohttp is optional - only needed for the async market fetching path
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# websockets is optional - only needed for streaming price updates
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+# orjson is optional - a faster JSON decoder for large market payloads
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# pandas is optional - vectorizes the active-market filter for large market lists
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Connection pool sizing for the shared REST session
+HTTP_POOL_CONNECTIONS = 32
+HTTP_POOL_MAXSIZE = 64
+
+# Concurrent order book checks; never exceeds the pool so sockets are reused
+VALIDATION_MAX_WORKERS = min(32, HTTP_POOL_MAXSIZE)
+
+# CLOB order book endpoints (single book and bulk lookup)
+CLOB_BOOK_URL = 'https://clob.polymarket.com/book'
+CLOB_BOOKS_URL = 'https://clob.polymarket.com/books'
+
+# CLOB market channel (order book and price change events per token)
+CLOB_WS_MARKET_URL = 'wss://ws-subscriptions-clob.polymarket.com/ws/market'
+WS_RECONNECT_MAX_DELAY = 30.0
+BOOKS_BATCH_SIZE = 100
+
+# Market count at which the active-market filter switches to pandas (0 = never).
+# Off by default: with memoized date parsing the per-row loop is faster for
+# the page sizes the Gamma API returns.
+VECTORIZED_FILTER_MIN_MARKETS = int(os.getenv('VECTORIZED_FILTER_MIN_MARKETS', '0'))
+
+
+def _tradeable_mask(markets: List[Dict], now_ts: float, one_year_ago_ts: float) -> List[bool]:
+    """
+    Vectorized is_tradeable() over a list of normalized markets (requires pandas)
+    
+    Builds one DataFrame from the market dicts and evaluates every rule as a
+    column operation, with the same semantics as is_tradeable().
+    
+    Args:
+        markets: Normalized market dictionaries
+        now_ts: Current time as an epoch timestamp
+        one_year_ago_ts: Creation cutoff as an epoch timestamp
+        
+    Returns:
+        One boolean per market, True if the market should be traded
+    """
+    df = pd.DataFrame.from_records(markets)
+    empty = pd.Series(None, index=df.index, dtype=object)
+    
+    def column(name: str) -> 'pd.Series':
+        return df[name].astype(object) if name in df.columns else empty
+    
+    def truthy(s: 'pd.Series') -> 'pd.Series':
+        # Missing keys come back as NaN, which must read as False like dict.get()
+        return s.where(s.notna(), False).astype(bool)
+    
+    def strings(s: 'pd.Series') -> 'pd.Series':
+        # .str raises on columns without any strings, so test each value instead
+        return s.map(lambda v: isinstance(v, str) and bool(v)).astype(bool)
+    
+    def timestamps(s: 'pd.Series') -> 'pd.Series':
+        # Non-string and unparseable dates become NaT, and NaT never compares as expired
+        s = s.where(strings(s))
+        return pd.to_datetime(s, utc=True, errors='coerce', format='ISO8601')
+    
+    now = pd.Timestamp(now_ts, unit='s', tz='UTC')
+    one_year_ago = pd.Timestamp(one_year_ago_ts, unit='s', tz='UTC')
+    
+    created_at = column('created_at')
+    created = created_at.where(truthy(created_at), column('createdAt'))
+    
+    mask = (
+        ~truthy(column('archived'))
+        & (truthy(column('accepting_orders')) | truthy(column('active')))
+        & ~(timestamps(column('end_date_iso')) < now)
+        & ~(timestamps(created) < one_year_ago)
+        & column('condition_id').map(
+            lambda v: isinstance(v, str) and is_condition_id(v) is not None
+        ).astype(bool)
+    )
+    return mask.tolist()
+
+
+# FileCache key for order book validation results ({condition_id: [ok, checked_at]})
+ORDER_BOOK_CACHE_KEY = "clob/book-validation"
+
+HTTP_HEADERS = {
+    "User-Agent": "poly-trading-bot/0.1",
+    "Accept": "application/json"
+}
+
+# Process-wide shared clients. Constructing a PolyMarketClient is cheap after the
+# first one: the ClobClient (signer/creds setup), the pooled HTTP session and the
+# rate limiter are created once and reused.
+_SHARED_LOCK = threading.Lock()
+_CLOB_CLIENTS: Dict[tuple, ClobClient] = {}
+_SHARED_SESSION: Optional[requests.Session] = None
+_RATE_LIMITERS: Dict[float, "_TokenBucket"] = {}
+
+
+class _TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+    
+    Tokens refill continuously at `rate` per second up to `burst`.
+    A non-positive rate disables limiting.
+    """
+    
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _take(self) -> float:
+        """Take a token if available; otherwise return seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        if self.rate <= 0:
+            return
+        while (wait := self._take()) > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self):
+        """Wait (without blocking the event loop) until a request may be sent"""
+        if self.rate <= 0:
+            return
+        while (wait := self._take()) > 0:
+            await asyncio.sleep(wait)
+
+
+def _get_clob_client(host: str, chain_id: int, creds: ApiCreds) -> ClobClient:
+    """Get the process-wide ClobClient for these credentials, creating it once"""
+    key = (host, chain_id, creds.api_key)
+    with _SHARED_LOCK:
+        client = _CLOB_CLIENTS.get(key)
+        if client is None:
+            client = ClobClient(host=host, chain_id=chain_id, creds=creds)
+            _CLOB_CLIENTS[key] = client
+        return client
+
+
+def _get_shared_session() -> requests.Session:
+    """Get the process-wide pooled HTTP session, creating it once"""
+    global _SHARED_SESSION
+    with _SHARED_LOCK:
+        if _SHARED_SESSION is None:
+            _SHARED_SESSION = PolyMarketClient._create_session()
+        return _SHARED_SESSION
+
+
+def _get_rate_limiter(rate: float) -> _TokenBucket:
+    """Get the process-wide rate limiter for a rate, so clients share one budget"""
+    with _SHARED_LOCK:
+        limiter = _RATE_LIMITERS.get(rate)
+        if limiter is None:
+            limiter = _TokenBucket(rate, burst=rate * 2)
+            _RATE_LIMITERS[rate] = limiter
+        return limiter
+
 
 class PolyMarketClient:
     """Simplified PolyMarket API client"""
     
-    def __init__(self):
-        """Initialize PolyMarket client with API credentials"""
+    def __init__(
+        self,
+        validate_order_books: Optional[bool] = None,
+        max_validate: Optional[int] = None,
+        rate_limit_per_s: Optional[float] = None
+    ):
+        """
+        Initialize PolyMarket client with API credentials
+        
+        Args:
+            validate_order_books: Check order books in get_markets()
+                (default: VALIDATE_ORDER_BOOKS env, off)
+            max_validate: Max markets to validate per call (default: MAX_VALIDATE env, 50)
+            rate_limit_per_s: Max REST requests per second (default: RATE_LIMIT env, 10; 0 disables)
+        """
         # Support both naming conventions
         api_key = os.getenv("POLYMARKET_API_KEY") or os.getenv("apiKey")
         api_secret = os.getenv("POLYMARKET_API_SECRET") or os.getenv("secret")
@@ -28,7 +242,8 @@ class PolyMarketClient:
         
         if not api_key or not api_secret:
             raise ValueError(
-                "API credentials must be set. Use POLYMARKET_API_KEY/POLYMARKET_API_SECRET or apiKey/secret"
+                "API credentials must be set. "
+                "Use POLYMARKET_API_KEY/POLYMARKET_API_SECRET or apiKey/secret"
             )
         
         # Create ApiCreds object
@@ -38,15 +253,122 @@ class PolyMarketClient:
             api_passphrase=passphrase if passphrase else ""
         )
         
-        # Initialize ClobClient
-        self.client = ClobClient(
+        # ClobClient shared by every instance with the same host/chain/key
+        self.client = _get_clob_client(
             host=os.getenv("POLYMARKET_HOST", "https://clob.polymarket.com"),
             chain_id=int(os.getenv("POLYMARKET_CHAIN_ID", POLYGON)),
             creds=creds
         )
         
+        # Shared HTTP session for REST calls (keep-alive + connection pooling)
+        self._session = _get_shared_session()
+        
+        # Order book validation is opt-in and capped to stay under API rate limits
+        if validate_order_books is None:
+            validate_order_books = os.getenv("VALIDATE_ORDER_BOOKS", "false").lower() == "true"
+        self.validate_order_books = validate_order_books
+        if max_validate is None:
+            max_validate = int(os.getenv("MAX_VALIDATE", "50"))
+        self.max_validate = max_validate
+        if rate_limit_per_s is None:
+            rate_limit_per_s = float(os.getenv("RATE_LIMIT", "10"))
+        self._rl = _get_rate_limiter(rate_limit_per_s)
+        
+        # aiohttp session for async methods (created lazily inside the event loop)
+        self._aio_session = None
+        self._aio_loop = None
+        
+        # Short-lived caches to collapse duplicate round-trips within a tick.
+        # Both hold prices, so keep them shorter than the scan interval.
+        self._market_cache = TTLCache(maxsize=4096, ttl=float(os.getenv("MARKET_TTL_S", "0.5")))
+        self._markets_cache = TTLCache(maxsize=8, ttl=float(os.getenv("MARKETS_TTL_S", "0.5")))
+        
+        # On-disk caches that survive restarts. Raw market pages carry prices,
+        # so caching them on disk is opt-in (MARKETS_FILE_CACHE_TTL_S > 0).
+        cache_dir = os.getenv("CACHE_DIR", ".cache")
+        self._book_file_cache = FileCache(
+            cache_dir, ttl=float(os.getenv("ORDER_BOOK_CACHE_TTL_S", "3600"))
+        )
+        self._markets_file_cache = FileCache(
+            cache_dir, ttl=float(os.getenv("MARKETS_FILE_CACHE_TTL_S", "0"))
+        )
+        
+        # ETag of the last market page fetched (for get_markets(if_none_match=...))
+        self.markets_etag: Optional[str] = None
+        
+        # In-memory copy of the order book results ({condition_id: [ok, checked_at]}),
+        # seeded from disk on first use so only cold starts read the file
+        self._book_ok: Optional[Dict[str, list]] = None
+        
         logger.info("PolyMarket client initialized")
     
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Create a pooled requests session with retries on transient errors"""
+        session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # POST /books is a read-only lookup, safe to retry
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+            # Back off as long as the server asks on 429/503
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=retry
+        )
+        session.mount("https://", adapter)
+        session.headers.update(HTTP_HEADERS)
+        return session
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a rate-limited request on the shared session"""
+        self._rl.acquire()
+        return self._session.request(method, url, **kwargs)
+    
+    def _get_aio_session(self) -> "aiohttp.ClientSession":
+        """
+        Get the shared aiohttp session, creating it on first use
+        
+        The session (and its connector's DNS/TLS state) is reused across calls
+        made from the same event loop. Await close_async() before that loop ends.
+        """
+        loop = asyncio.get_running_loop()
+        if self._aio_session is None or self._aio_session.closed or self._aio_loop is not loop:
+            self._discard_aio_session()
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=HTTP_POOL_MAXSIZE, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers=HTTP_HEADERS
+            )
+            self._aio_loop = loop
+        return self._aio_session
+    
+    def _discard_aio_session(self):
+        """Close a session created on another event loop, which can't be awaited from this one"""
+        session, loop = self._aio_session, self._aio_loop
+        self._aio_session = None
+        self._aio_loop = None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            # Its loop has stopped, taking the transports with it; detach so
+            # the session stops holding the connector
+            logger.debug("Dropping aiohttp session from a stopped event loop")
+            session.detach()
+    
+    async def close_async(self):
+        """Close the aiohttp session used by the async methods"""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+        self._aio_loop = None
+    
     def get_market_by_slug(self, slug: str) -> Optional[Dict]:
         """
         Get a specific market by its slug using Gamma API
@@ -58,12 +380,11 @@ class PolyMarketClient:
             Market dictionary or None if not found
         """
         try:
-            import requests
             url = f'https://gamma-api.polymarket.com/markets?slug={slug}'
             
-            response = requests.get(url, timeout=10)
+            response = self._request('GET', url, timeout=10)
             if response.status_code == 200:
-                markets = response.json()
+                markets = _json_loads(response.content)
                 if isinstance(markets, list) and len(markets) > 0:
                     market = markets[0]
                     # Normalize field names
@@ -73,176 +394,589 @@ class PolyMarketClient:
                         market['market_slug'] = market['slug']
                     if 'endDate' in market:
                         market['end_date_iso'] = market['endDate']
-                    market['accepting_orders'] = market.get('active', False) and not market.get('closed', False)
+                    market['accepting_orders'] = (
+                        market.get('active', False) and not market.get('closed', False)
+                    )
                     return market
             return None
         except Exception as e:
-            logger.error(f"Error fetching market by slug: {e}")
+            logger.error("Error fetching market by slug: %s", e)
             return None
     
-    def get_markets(self, active: bool = True) -> List[Dict]:
+    def get_markets(
+        self, active: bool = True, if_none_match: Optional[str] = None
+    ) -> Optional[List[Dict]]:
         """
         Get all active markets using Gamma API
         
         Args:
             active: Only return active markets
+            if_none_match: ETag from a previous call (markets_etag). The request is
+                then always sent as a conditional GET, bypassing the caches, and
+                None is returned if the server answers 304 Not Modified
             
         Returns:
-            List of market dictionaries
+            List of market dictionaries, or None if not modified since if_none_match
             
         Uses Gamma API (https://gamma-api.polymarket.com/markets) which is the correct
         endpoint for fetching market information. This API returns markets that exist
         on the PolyMarket website, unlike the CLOB API which may miss some markets.
+        
+        Results are cached for MARKETS_TTL_S seconds (default 0.5).
         """
+        if if_none_match is None:
+            cached = self._markets_cache.get((active,))
+            if cached is not None:
+                return cached
+        
         try:
-            import requests
-            
             # Use Gamma API - the correct endpoint for market data
             # Gamma API has a max limit of ~500 markets per request
             # For more markets, we may need to use multiple requests or different parameters
             limit = int(os.getenv("GAMMA_API_LIMIT", "500"))  # Max seems to be 500
             url = f'https://gamma-api.polymarket.com/markets?limit={limit}'
             
-            logger.debug(f"Fetching markets using Gamma API (limit={limit})...")
-            
-            response = requests.get(url, timeout=15)
-            if response.status_code == 200:
-                markets = response.json()
+            markets, fresh = (None, False) if if_none_match else self._markets_file_cache.get(url)
+            if fresh:
+                logger.debug("Using markets from file cache")
+            else:
+                logger.debug("Fetching markets using Gamma API (limit=%d)...", limit)
                 
-                # Gamma API returns a list directly
-                if not isinstance(markets, list):
-                    logger.warning(f"Unexpected response type from Gamma API: {type(markets)}")
+                headers = {'If-None-Match': if_none_match} if if_none_match else None
+                response = self._request('GET', url, headers=headers, timeout=15)
+                if response.status_code == 304:
+                    logger.debug("Market list not modified")
+                    return None
+                if response.status_code == 200:
+                    self.markets_etag = response.headers.get('ETag')
+                    markets = _json_loads(response.content)
+                    if self._markets_file_cache.ttl > 0 and isinstance(markets, list):
+                        self._markets_file_cache.set(url, markets)
+                    logger.info(
+                        "Note: Gamma API returns max 500 markets. "
+                        "Use get_market_by_slug() for specific markets."
+                    )
+                else:
+                    logger.warning("Gamma API returned status %s", response.status_code)
                     markets = []
-                
-                # Normalize field names to match CLOB API format for compatibility
-                # Gamma API uses: conditionId, slug, endDate, closed, active
-                # CLOB API uses: condition_id, market_slug, end_date_iso, closed, active, accepting_orders
-                normalized_markets = []
-                for market in markets:
-                    normalized = market.copy()
-                    # Map Gamma API fields to CLOB API field names
-                    if 'conditionId' in normalized:
-                        normalized['condition_id'] = normalized.pop('conditionId')
-                    if 'slug' in normalized:
-                        normalized['market_slug'] = normalized['slug']
-                    if 'endDate' in normalized:
-                        normalized['end_date_iso'] = normalized['endDate']
-                    # Gamma API doesn't have accepting_orders, infer from active and closed
-                    normalized['accepting_orders'] = normalized.get('active', False) and not normalized.get('closed', False)
-                    normalized_markets.append(normalized)
-                
-                markets = normalized_markets
-                logger.debug(f"Fetched {len(markets)} markets from Gamma API")
-                logger.info(f"Note: Gamma API returns max 500 markets. Use get_market_by_slug() for specific markets.")
-            else:
-                logger.warning(f"Gamma API returned status {response.status_code}")
+            
+            # Gamma API returns a list directly
+            if not isinstance(markets, list):
+                logger.warning("Unexpected response type from Gamma API: %s", type(markets))
                 markets = []
             
+            markets = self._normalize_markets(markets)
+            logger.debug("Fetched %d markets from Gamma API", len(markets))
+            
             # Filter active markets if requested
             if active and markets:
-                # Filter for markets that are accepting orders and not expired
-                # A market is "active" for trading if it's accepting orders and not past end date
-                filtered = []
-                from datetime import datetime, timezone
-                current_date = datetime.now(timezone.utc)
-                
-                for m in markets:
-                    if isinstance(m, dict):
-                        # Include markets that are:
-                        # 1. Not archived
-                        # 2. Accepting orders (or active flag is true)
-                        # 3. Not expired (end_date is in the future or None)
-                        is_archived = m.get('archived', False)
-                        accepting_orders = m.get('accepting_orders', False)
-                        is_active = m.get('active', False)
-                        
-                        # Check if expired
-                        end_date_str = m.get('end_date_iso')
-                        is_expired = False
-                        if end_date_str:
-                            try:
-                                # Parse ISO format date (handles both Z and +00:00)
-                                if end_date_str.endswith('Z'):
-                                    end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
-                                else:
-                                    end_date = datetime.fromisoformat(end_date_str)
-                                
-                                # Ensure both are timezone-aware for comparison
-                                if end_date.tzinfo is None:
-                                    end_date = end_date.replace(tzinfo=timezone.utc)
-                                
-                                is_expired = end_date < current_date
-                            except (ValueError, AttributeError, TypeError):
-                                # If we can't parse the date, don't filter it out
-                                pass
-                        
-                        # Also check if market is too old (more than 1 year old) even without end date
-                        # This catches markets that are clearly expired but don't have end_date set
-                        from datetime import timedelta
-                        created_str = m.get('created_at') or m.get('createdAt')
-                        if not is_expired and created_str:
-                            try:
-                                if created_str.endswith('Z'):
-                                    created_date = datetime.fromisoformat(created_str.replace('Z', '+00:00'))
-                                else:
-                                    created_date = datetime.fromisoformat(created_str)
-                                
-                                if created_date.tzinfo is None:
-                                    created_date = created_date.replace(tzinfo=timezone.utc)
-                                
-                                # If market is more than 1 year old, consider it expired
-                                one_year_ago = current_date - timedelta(days=365)
-                                if created_date < one_year_ago:
-                                    is_expired = True
-                            except (ValueError, AttributeError, TypeError):
-                                pass
-                        
-                        # Market is tradeable if not archived, not expired, and (accepting orders or active)
-                        if not is_archived and not is_expired and (accepting_orders or is_active):
-                            # Additional validation: verify condition_id format
-                            condition_id = m.get('condition_id')
-                            if condition_id and condition_id.startswith('0x') and len(condition_id) == 66:
-                                filtered.append(m)
-                            else:
-                                logger.debug(f"Skipping market with invalid condition_id: {condition_id}")
+                filtered = self._filter_active_markets(markets)
                 
                 # Validate order books to ensure markets are actually tradeable
                 # This filters out stale markets that the API returns but are no longer valid
-                validated_markets = []
-                validate_order_books = os.getenv("VALIDATE_ORDER_BOOKS", "true").lower() == "true"
-                
-                if validate_order_books and filtered:
-                    logger.debug(f"Validating order books for {len(filtered)} markets...")
-                    for m in filtered:
-                        condition_id = m.get('condition_id')
-                        if condition_id:
-                            try:
-                                # Quick check: verify order book exists
-                                book_url = f'https://clob.polymarket.com/book?token_id={condition_id}'
-                                book_response = requests.get(book_url, timeout=3)
-                                if book_response.status_code == 200:
-                                    validated_markets.append(m)
-                                else:
-                                    logger.debug(f"Market {condition_id[:20]}... has no order book (invalid/expired)")
-                            except Exception as e:
-                                # If validation fails, include it anyway (might be network issue)
-                                logger.debug(f"Could not validate order book for {condition_id[:20]}...: {e}")
-                                validated_markets.append(m)
-                        else:
-                            validated_markets.append(m)
-                    
-                    markets = validated_markets
-                    logger.debug(f"Validated: {len(markets)} markets have valid order books")
+                if self.validate_order_books and filtered:
+                    filtered = self._cap_validation(filtered)
+                    logger.debug("Validating order books for %d markets...", len(filtered))
+                    markets = self._validate_order_books(filtered)
+                    logger.debug("Validated: %d markets have valid order books", len(markets))
                 else:
                     markets = filtered
                 
-                logger.debug(f"Final count: {len(markets)} active, non-expired, validated tradeable markets")
+                logger.debug(
+                    "Final count: %d active, non-expired, validated tradeable markets", len(markets)
+                )
             
+            if markets:
+                self._markets_cache.set((active,), markets)
             return markets
         except Exception as e:
-            logger.error(f"Error fetching markets: {e}", exc_info=True)
+            logger.error("Error fetching markets: %s", e, exc_info=True)
             return []
     
+    async def get_markets_async(self, active: bool = True, pages: int = 1) -> List[Dict]:
+        """
+        Async variant of get_markets() using aiohttp
+        
+        Args:
+            active: Only return active markets
+            pages: Number of Gamma API pages (GAMMA_API_LIMIT markets each) to fetch
+            
+        Returns:
+            List of market dictionaries
+            
+        Pages and order book validation requests are issued concurrently with
+        asyncio.gather over a shared connection pool instead of a thread pool.
+        Single-page results share the get_markets() result cache.
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError(
+                "aiohttp is required for get_markets_async(). Install with: pip install aiohttp"
+            )
+        
+        cache_key = (active,) if pages <= 1 else (active, pages)
+        cached = self._markets_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            session = self._get_aio_session()
+            limit = int(os.getenv("GAMMA_API_LIMIT", "500"))
+            url = f'https://gamma-api.polymarket.com/markets?limit={limit}'
+            urls = [url] + [f'{url}&offset={page * limit}' for page in range(1, pages)]
+            
+            logger.debug(
+                "Fetching markets using Gamma API (limit=%d, pages=%d, async)...", limit, len(urls)
+            )
+            results = await asyncio.gather(
+                *(self._fetch_markets_page_async(session, u) for u in urls)
+            )
+            markets = [m for page in results for m in page]
+            markets = self._normalize_markets(markets)
+            
+            if active and markets:
+                filtered = self._filter_active_markets(markets)
+                
+                if self.validate_order_books and filtered:
+                    markets = await self._validate_order_books_async(self._cap_validation(filtered))
+                    logger.debug("Validated: %d markets have valid order books", len(markets))
+                else:
+                    markets = filtered
+            
+            if markets:
+                self._markets_cache.set(cache_key, markets)
+            return markets
+        except Exception as e:
+            logger.error("Error fetching markets: %s", e, exc_info=True)
+            return []
+    
+    async def _fetch_markets_page_async(
+        self, session: "aiohttp.ClientSession", url: str
+    ) -> List[Dict]:
+        """
+        Fetch one page of raw Gamma API markets (or take it from the file cache)
+        
+        Args:
+            session: Shared aiohttp session
+            url: Page URL
+            
+        Returns:
+            List of raw market dictionaries (empty on a bad response)
+        """
+        markets, fresh = self._markets_file_cache.get(url)
+        if not fresh:
+            await self._rl.acquire_async()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as response:
+                if response.status == 200:
+                    markets = await response.json(content_type=None, loads=_json_loads)
+                    if self._markets_file_cache.ttl > 0 and isinstance(markets, list):
+                        self._markets_file_cache.set(url, markets)
+                else:
+                    logger.warning("Gamma API returned status %s", response.status)
+                    markets = []
+        
+        if not isinstance(markets, list):
+            logger.warning("Unexpected response type from Gamma API: %s", type(markets))
+            return []
+        return markets
+    
+    async def _validate_order_books_async(self, markets: List[Dict]) -> List[Dict]:
+        """
+        Async variant of _validate_order_books() using asyncio.gather
+        
+        Args:
+            markets: Candidate markets (must have 'condition_id')
+            
+        Returns:
+            Markets whose order book exists (or could not be checked)
+        """
+        session = self._get_aio_session()
+        
+        async def fetch_books(batch: List[str]) -> Dict[str, bool]:
+            payload = [{'token_id': condition_id} for condition_id in batch]
+            await self._rl.acquire_async()
+            timeout = aiohttp.ClientTimeout(total=10)
+            async with session.post(CLOB_BOOKS_URL, json=payload, timeout=timeout) as response:
+                if response.status != 200:
+                    raise ValueError(f"POST /books returned status {response.status}")
+                books = await response.json(content_type=None, loads=_json_loads)
+                return self._parse_books_response(batch, books)
+        
+        async def has_order_book(condition_id: str) -> bool:
+            await self._rl.acquire_async()
+            url = f'{CLOB_BOOK_URL}?token_id={condition_id}'
+            async with session.head(url, timeout=aiohttp.ClientTimeout(total=3)) as response:
+                return response.status == 200
+        
+        known = self._load_order_book_cache()
+        batches = self._order_book_batches(markets, known)
+        checked = {}
+        fallback = []
+        
+        results = await asyncio.gather(
+            *(fetch_books(batch) for batch in batches), return_exceptions=True
+        )
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.debug(
+                    "Bulk order book lookup failed (%s), falling back to HEAD requests", result
+                )
+                fallback.extend(batch)
+            else:
+                checked.update(result)
+        
+        results = await asyncio.gather(
+            *(has_order_book(condition_id) for condition_id in fallback), return_exceptions=True
+        )
+        for condition_id, result in zip(fallback, results):
+            if isinstance(result, Exception):
+                # If validation fails, include it anyway (might be network issue)
+                logger.debug("Could not validate order book for %.20s...: %s", condition_id, result)
+            else:
+                checked[condition_id] = result
+        
+        return self._apply_order_book_results(markets, known, checked)
+    
+    @staticmethod
+    def _order_book_batches(markets: List[Dict], known: Dict[str, bool]) -> List[List[str]]:
+        """
+        Group condition_ids that still need an order book check into POST /books batches
+        
+        Args:
+            markets: Candidate markets
+            known: Condition ids with cached results (skipped)
+            
+        Returns:
+            List of condition_id batches
+        """
+        to_check = list(dict.fromkeys(
+            m['condition_id'] for m in markets
+            if m.get('condition_id') and m['condition_id'] not in known
+        ))
+        return [to_check[i:i + BOOKS_BATCH_SIZE] for i in range(0, len(to_check), BOOKS_BATCH_SIZE)]
+    
+    @staticmethod
+    def _parse_books_response(batch: List[str], books) -> Dict[str, bool]:
+        """
+        Map a POST /books response to per-id validity
+        
+        Args:
+            batch: Condition ids that were requested
+            books: Decoded response body (list of order books)
+            
+        Returns:
+            Dict mapping condition_id to True if its book has bids or asks
+        """
+        if not isinstance(books, list):
+            raise ValueError(f"Unexpected POST /books response type: {type(books)}")
+        
+        has_liquidity = {
+            book.get('asset_id'): bool(book.get('bids') or book.get('asks'))
+            for book in books if isinstance(book, dict)
+        }
+        return {condition_id: has_liquidity.get(condition_id, False) for condition_id in batch}
+    
+    def _load_order_book_cache(self) -> Dict[str, bool]:
+        """
+        Load unexpired order book validation results
+        
+        Results are kept in memory; the file cache is only read the first time.
+        
+        Returns:
+            Dict mapping condition_id to whether its order book exists
+        """
+        if self._book_ok is None:
+            entries, _ = self._book_file_cache.get(ORDER_BOOK_CACHE_KEY)
+            self._book_ok = entries if isinstance(entries, dict) else {}
+        
+        cutoff = time.time() - self._book_file_cache.ttl
+        return {
+            condition_id: ok for condition_id, (ok, checked_at) in self._book_ok.items()
+            if checked_at > cutoff
+        }
+    
+    def _apply_order_book_results(
+        self,
+        markets: List[Dict],
+        known: Dict[str, bool],
+        checked: Dict[str, bool]
+    ) -> List[Dict]:
+        """
+        Persist fresh validation results and drop markets without an order book
+        
+        Args:
+            markets: Candidate markets
+            known: Results loaded from the file cache
+            checked: Results from this round of network checks
+            
+        Returns:
+            Markets whose order book exists (or could not be checked)
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            for condition_id, ok in checked.items():
+                if not ok:
+                    logger.debug(
+                        "Market %.20s... has no order book (invalid/expired)", condition_id
+                    )
+        
+        if checked:
+            now = time.time()
+            cutoff = now - self._book_file_cache.ttl
+            entries = {
+                condition_id: entry for condition_id, entry in (self._book_ok or {}).items()
+                if entry[1] > cutoff
+            }
+            entries.update({condition_id: [ok, now] for condition_id, ok in checked.items()})
+            self._book_ok = entries
+            self._book_file_cache.set(ORDER_BOOK_CACHE_KEY, entries)
+            known = {**known, **checked}
+        
+        # Markets we couldn't check are kept; original order is preserved
+        return [m for m in markets if known.get(m.get('condition_id'), True)]
+    
+    @staticmethod
+    def _normalize_markets(markets: List[Dict]) -> List[Dict]:
+        """
+        Normalize Gamma API field names to match CLOB API format for compatibility
+        
+        Args:
+            markets: Raw market dictionaries from Gamma API
+            
+        Returns:
+            List of normalized market dictionaries
+        """
+        # Gamma API uses: conditionId, slug, endDate, closed, active
+        # CLOB API uses: condition_id, market_slug, end_date_iso, closed, active, accepting_orders
+        normalized_markets = []
+        for market in markets:
+            normalized = market.copy()
+            # Map Gamma API fields to CLOB API field names
+            if 'conditionId' in normalized:
+                normalized['condition_id'] = normalized.pop('conditionId')
+            if 'slug' in normalized:
+                normalized['market_slug'] = normalized['slug']
+            if 'endDate' in normalized:
+                normalized['end_date_iso'] = normalized['endDate']
+            # Gamma API doesn't have accepting_orders, infer from active and closed
+            normalized['accepting_orders'] = (
+                normalized.get('active', False) and not normalized.get('closed', False)
+            )
+            normalized_markets.append(normalized)
+        
+        return normalized_markets
+    
+    @staticmethod
+    def _filter_active_markets(markets: List[Dict]) -> List[Dict]:
+        """
+        Filter for markets that are accepting orders and not expired
+        
+        A market is "active" for trading if it's accepting orders and not past end date
+        
+        Args:
+            markets: Normalized market dictionaries
+            
+        Returns:
+            List of tradeable market dictionaries
+        """
+        current_date = datetime.now(timezone.utc)
+        now_ts = current_date.timestamp()
+        # Markets created more than a year ago are treated as expired
+        one_year_ago_ts = (current_date - timedelta(days=365)).timestamp()
+        
+        if PANDAS_AVAILABLE and 0 < VECTORIZED_FILTER_MIN_MARKETS <= len(markets):
+            candidates = [m for m in markets if isinstance(m, dict)]
+            mask = _tradeable_mask(candidates, now_ts, one_year_ago_ts)
+            filtered = list(compress(candidates, mask))
+        else:
+            filtered = [
+                m for m in markets
+                if isinstance(m, dict) and is_tradeable(m, now_ts, one_year_ago_ts)
+            ]
+        
+        logger.debug("Filtered %d of %d markets as tradeable", len(filtered), len(markets))
+        return filtered
+    
+    def _cap_validation(self, markets: List[Dict]) -> List[Dict]:
+        """Limit the markets sent to order book validation to max_validate"""
+        if len(markets) > self.max_validate:
+            logger.debug(
+                "Validating first %d of %d markets (MAX_VALIDATE)", self.max_validate, len(markets)
+            )
+            return markets[:self.max_validate]
+        return markets
+    
+    def _validate_order_books(self, markets: List[Dict]) -> List[Dict]:
+        """
+        Check order books and drop markets without one
+        
+        Uses the bulk POST /books endpoint; batches it can't answer fall back
+        to concurrent HEAD /book requests, which skip the body transfer.
+        
+        Args:
+            markets: Candidate markets (must have 'condition_id')
+            
+        Returns:
+            Markets whose order book exists (or could not be checked)
+        """
+        known = self._load_order_book_cache()
+        batches = self._order_book_batches(markets, known)
+        checked = {}
+        fallback = []
+        
+        with ThreadPoolExecutor(max_workers=VALIDATION_MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(
+                    self._request,
+                    'POST',
+                    CLOB_BOOKS_URL,
+                    json=[{'token_id': condition_id} for condition_id in batch],
+                    timeout=10
+                ): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    response = future.result()
+                    if response.status_code != 200:
+                        raise ValueError(f"POST /books returned status {response.status_code}")
+                    checked.update(self._parse_books_response(batch, _json_loads(response.content)))
+                except Exception as e:
+                    logger.debug(
+                        "Bulk order book lookup failed (%s), falling back to HEAD requests", e
+                    )
+                    fallback.extend(batch)
+            
+            futures = {
+                executor.submit(
+                    self._request, 'HEAD', f'{CLOB_BOOK_URL}?token_id={condition_id}', timeout=3
+                ): condition_id
+                for condition_id in fallback
+            }
+            for future in as_completed(futures):
+                condition_id = futures[future]
+                try:
+                    checked[condition_id] = future.result().status_code == 200
+                except Exception as e:
+                    # If validation fails, include it anyway (might be network issue)
+                    logger.debug("Could not validate order book for %.20s...: %s", condition_id, e)
+        
+        return self._apply_order_book_results(markets, known, checked)
+    
+    async def subscribe_prices(
+        self,
+        markets: List[Dict],
+        on_message: Callable[[Dict], Awaitable[None]]
+    ):
+        """
+        Stream price updates for markets over the CLOB websocket
+        
+        Runs until cancelled, reconnecting with exponential backoff. Each time a
+        market's best ask moves, on_message is awaited with a copy of the market
+        carrying the new 'yes_price'/'no_price'.
+        
+        Args:
+            markets: Markets to watch (need 'clobTokenIds' or 'tokens': YES first, then NO)
+            on_message: Coroutine called with the updated market dict
+        """
+        if not WEBSOCKETS_AVAILABLE:
+            raise ImportError(
+                "websockets is required for subscribe_prices(); "
+                "install with: pip install websockets"
+            )
+        
+        # token_id -> (market copy, price field it drives)
+        tokens: Dict[str, Tuple[Dict, str]] = {}
+        for market in markets:
+            token_ids = self._token_ids(market)
+            if len(token_ids) == 2:
+                market = dict(market)
+                tokens[token_ids[0]] = (market, 'yes_price')
+                tokens[token_ids[1]] = (market, 'no_price')
+        
+        if not tokens:
+            logger.warning("No markets with token ids to stream")
+            return
+        
+        delay = 1.0
+        while True:
+            try:
+                async with websockets.connect(CLOB_WS_MARKET_URL, ping_interval=20) as ws:
+                    await ws.send(json.dumps({'assets_ids': list(tokens), 'type': 'market'}))
+                    logger.info("Streaming prices for %d markets", len(tokens) // 2)
+                    delay = 1.0
+                    
+                    async for raw in ws:
+                        # Most frames (trades, tick size changes, PONGs) carry no
+                        # prices - skip them without decoding
+                        if isinstance(raw, bytes):
+                            raw = raw.decode()
+                        if '"asks"' not in raw and '"best_ask"' not in raw:
+                            continue
+                        try:
+                            events = _json_loads(raw)
+                        except ValueError:
+                            logger.debug("Skipping undecodable price stream frame")
+                            continue
+                        
+                        for token_id, price in self._parse_price_events(events):
+                            entry = tokens.get(token_id)
+                            if entry is None:
+                                continue
+                            market, field = entry
+                            if market.get(field) != price:
+                                market[field] = price
+                                await on_message(market)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Price stream disconnected (%s), reconnecting in %.0fs", e, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, WS_RECONNECT_MAX_DELAY)
+    
+    @staticmethod
+    def _token_ids(market: Dict) -> List[str]:
+        """Get a market's outcome token ids (Gamma 'clobTokenIds' or CLOB 'tokens')"""
+        token_ids = market.get('clobTokenIds')
+        if isinstance(token_ids, str):
+            # Gamma API returns the list JSON-encoded
+            try:
+                token_ids = _json_loads(token_ids)
+            except ValueError:
+                return []
+        if not token_ids:
+            tokens = market.get('tokens') or []
+            token_ids = [t.get('token_id') for t in tokens if isinstance(t, dict)]
+        return [str(t) for t in token_ids if t]
+    
+    @staticmethod
+    def _parse_price_events(events) -> Iterator[Tuple[str, float]]:
+        """
+        Extract (token_id, best ask) pairs from decoded market channel messages
+        
+        Handles 'book' snapshots (lowest ask) and 'price_change' events
+        (best_ask per change). Other event types are ignored.
+        """
+        if isinstance(events, dict):
+            events = [events]
+        elif not isinstance(events, list):
+            return
+        
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            event_type = event.get('event_type')
+            try:
+                if event_type == 'book':
+                    asks = event.get('asks') or []
+                    if asks:
+                        yield event['asset_id'], min(float(ask['price']) for ask in asks)
+                elif event_type == 'price_change':
+                    for change in event.get('price_changes') or []:
+                        if change.get('best_ask'):
+                            yield change['asset_id'], float(change['best_ask'])
+            except (KeyError, TypeError, ValueError):
+                logger.debug("Skipping malformed %s event", event_type)
+    
     def get_market(self, market_id: str) -> Optional[Dict]:
         """
         Get specific market by ID
@@ -252,11 +986,20 @@ class PolyMarketClient:
             
         Returns:
             Market dictionary or None
+            
+        Results are cached for MARKET_TTL_S seconds (default 0.5).
         """
+        market = self._market_cache.get(market_id)
+        if market is not None:
+            return market
+        
         try:
-            return self.client.get_market(market_id)
+            market = self.client.get_market(market_id)
+            if market:
+                self._market_cache.set(market_id, market)
+            return market
         except Exception as e:
-            logger.error(f"Error fetching market {market_id}: {e}")
+            logger.error("Error fetching market %s: %s", market_id, e)
             return None
     
     def get_market_prices(self, market_id: str) -> Optional[Dict]:
@@ -282,7 +1025,7 @@ class PolyMarketClient:
                 'market_id': market_id
             }
         except Exception as e:
-            logger.error(f"Error fetching prices for {market_id}: {e}")
+            logger.error("Error fetching prices for %s: %s", market_id, e)
             return None
     
     def place_order(
@@ -327,14 +1070,47 @@ class PolyMarketClient:
                 order_type=order_type
             )
             
-            logger.info(f"Order placed: {side} {size} shares @ ${price:.4f} on market {market_id}")
+            # Market state changed - don't serve stale data for it
+            self.invalidate(market_id)
+            
+            logger.info(
+                "Order placed: %s %s shares @ $%.4f on market %s", side, size, price, market_id
+            )
             return order
             
         except Exception as e:
-            logger.error(f"Error placing order: {e}")
-            logger.error("Note: You may need to adjust create_order() parameters based on py-clob-client API")
+            logger.error("Error placing order: %s", e)
+            logger.error(
+                "Note: You may need to adjust create_order() parameters "
+                "based on py-clob-client API"
+            )
             return None
     
+    async def place_order_async(
+        self,
+        market_id: str,
+        side: str,
+        price: float,
+        size: float,
+        order_type: str = "LIMIT"
+    ) -> Optional[Dict]:
+        """
+        Async variant of place_order()
+        
+        py-clob-client is synchronous, so the call runs in a worker thread;
+        this lets several orders be in flight at once via asyncio.gather.
+        """
+        return await asyncio.to_thread(self.place_order, market_id, side, price, size, order_type)
+    
+    def invalidate(self, market_id: Optional[str] = None):
+        """
+        Drop cached market data
+        
+        Args:
+            market_id: Market to invalidate, or None to clear the whole market cache
+        """
+        self._market_cache.invalidate(market_id)
+    
     def cancel_order(self, order_id: str) -> bool:
         """
         Cancel an order
@@ -347,12 +1123,18 @@ class PolyMarketClient:
         """
         try:
             self.client.cancel_order(order_id)
-            logger.info(f"Order {order_id} cancelled")
+            # The order's market isn't known here, so drop all cached market data
+            self.invalidate()
+            logger.info("Order %s cancelled", order_id)
             return True
         except Exception as e:
-            logger.error(f"Error cancelling order {order_id}: {e}")
+            logger.error("Error cancelling order %s: %s", order_id, e)
             return False
     
+    async def cancel_order_async(self, order_id: str) -> bool:
+        """Async variant of cancel_order() (runs in a worker thread)"""
+        return await asyncio.to_thread(self.cancel_order, order_id)
+    
     def get_balance(self) -> float:
         """
         Get available USDC balance
@@ -378,6 +1160,6 @@ class PolyMarketClient:
             return 1000.0  # Placeholder
             
         except Exception as e:
-            logger.error(f"Error fetching balance: {e}")
+            logger.error("Error fetching balance: %s", e)
             return 0.0
 
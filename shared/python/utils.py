@@ -2,10 +2,32 @@
 Common utility functions
 """
 import logging
+import math
+import os
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Iterator, Tuple
 import json
 
+import numpy as np
+
+from jit import njit, prange
+
+# orjson is optional - a faster drop-in for serializing trade records
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# fcntl is POSIX-only - used to serialize trade log writes across processes
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,30 +49,108 @@ def setup_logging(log_level: str = "INFO", log_file: str = None):
     )
 
 
+# Need at least 1% profit after fees to be worthwhile
+MIN_PROFIT_THRESHOLD = 0.01
+
+
 def calculate_profit_margin(yes_price: float, no_price: float, fee_rate: float = 0.02) -> tuple:
     """
     Calculate if arbitrage is profitable after fees
     
+    Prices are rounded to the nearest basis point (0.0001) before the fee
+    math, so repeated quotes within a scan share a cached result. Prices
+    finer than that are not distinguished.
+    
     Args:
         yes_price: Price of YES shares
         no_price: Price of NO shares
         fee_rate: Trading fee rate (default 2%)
         
     Returns:
-        Tuple of (is_profitable, profit_margin)
+        Tuple of (is_profitable, profit_margin); (False, 0.0) if a price is
+        NaN or infinite
+    """
+    if not (math.isfinite(yes_price) and math.isfinite(no_price)):
+        return False, 0.0
+    return _profit_margin_bp(
+        round(yes_price * 10000), round(no_price * 10000), fee_rate, MIN_PROFIT_THRESHOLD
+    )
+
+
+@njit(cache=True, inline='always')
+def profit_margin_from_bp(
+    yes_bp: float, no_bp: float, fee_rate: float, min_profit_threshold: float
+) -> float:
     """
-    total_cost = yes_price + no_price
-    fees = total_cost * fee_rate
-    total_cost_with_fees = total_cost + fees
+    Profit margin after fees for prices in basis points, 0.0 if below min_profit_threshold
     
-    # Need at least 1% profit after fees to be worthwhile
-    min_profit_threshold = 0.01
+    The one place the fee rule lives: calculate_profit_margin(), the batch
+    kernel below and the detector kernels all call it. The threshold is an
+    argument rather than a read of MIN_PROFIT_THRESHOLD, so compiled callers
+    never keep a stale copy of the global.
+    """
+    total_cost = (yes_bp + no_bp) / 10000
+    total_cost_with_fees = total_cost + total_cost * fee_rate
+    if total_cost_with_fees < 1.0 - min_profit_threshold:
+        return 1.0 - total_cost_with_fees
+    return 0.0
+
+
+@lru_cache(maxsize=8192)
+def _profit_margin_bp(
+    yes_bp: int, no_bp: int, fee_rate: float, min_profit_threshold: float
+) -> tuple:
+    """calculate_profit_margin() on prices in basis points (memoized)"""
+    profit_margin = profit_margin_from_bp(yes_bp, no_bp, fee_rate, min_profit_threshold)
+    return profit_margin > 0.0, profit_margin
+
+
+@njit(cache=True, boundscheck=False, parallel=True)
+def _profit_margin_batch_kernel(
+    yes_prices: np.ndarray,
+    no_prices: np.ndarray,
+    fee_rate: float,
+    min_profit_threshold: float,
+    is_profitable: np.ndarray,
+    profit_margin: np.ndarray
+):
+    """Compiled loop behind calculate_profit_margin_batch() (fills the two output arrays)"""
+    for i in prange(yes_prices.shape[0]):
+        yes_bp = np.rint(yes_prices[i] * 10000)
+        no_bp = np.rint(no_prices[i] * 10000)
+        margin = profit_margin_from_bp(yes_bp, no_bp, fee_rate, min_profit_threshold)
+        is_profitable[i] = margin > 0.0
+        profit_margin[i] = margin
+
+
+def calculate_profit_margin_batch(
+    yes_prices: np.ndarray,
+    no_prices: np.ndarray,
+    fee_rate: float = 0.02
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized calculate_profit_margin() over many markets at once
     
-    if total_cost_with_fees < (1.0 - min_profit_threshold):
-        profit_margin = 1.0 - total_cost_with_fees
-        return True, profit_margin
+    Runs as one multi-threaded compiled loop when numba is installed (a plain
+    Python loop otherwise).
     
-    return False, 0.0
+    Args:
+        yes_prices: Array of YES share prices
+        no_prices: Array of NO share prices
+        fee_rate: Trading fee rate (default 2%)
+        
+    Returns:
+        Tuple of (is_profitable mask, profit_margin array); margins are 0.0
+        where not profitable
+    """
+    yes_prices = np.ascontiguousarray(yes_prices, dtype=np.float64)
+    no_prices = np.ascontiguousarray(no_prices, dtype=np.float64)
+    is_profitable = np.empty(yes_prices.shape[0], dtype=np.bool_)
+    profit_margin = np.empty(yes_prices.shape[0], dtype=np.float64)
+    _profit_margin_batch_kernel(
+        yes_prices, no_prices, fee_rate, MIN_PROFIT_THRESHOLD, is_profitable, profit_margin
+    )
+    return is_profitable, profit_margin
 
 
 def format_currency(amount: float) -> str:
@@ -63,31 +163,107 @@ def format_percentage(value: float) -> str:
     return f"{value * 100:.2f}%"
 
 
-def log_trade(trade_data: Dict[str, Any], log_file: str = "trades.json"):
+def _json_line(data: Dict[str, Any]) -> bytes:
+    """Serialize a record as one compact JSON line"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data) + b'\n'
+    return (json.dumps(data, separators=(',', ':')) + '\n').encode()
+
+
+@contextmanager
+def _file_lock(f):
+    """Hold an exclusive advisory lock on an open file (no-op without fcntl)"""
+    if not FCNTL_AVAILABLE:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _append_to_json_array(f, record: bytes):
+    """
+    Append a serialized record to a file holding a JSON array
+    
+    Overwrites the closing ']' in place instead of parsing the history, so
+    the cost is proportional to the new record only.
+    
+    Args:
+        f: File opened in 'r+b' mode
+        record: Serialized JSON object (no trailing newline)
+    """
+    end = f.seek(0, os.SEEK_END)
+    if end == 0:
+        f.write(b'[' + record + b']\n')
+        return
+    
+    f.seek(max(0, end - 64))
+    tail = f.read()
+    stripped = tail.rstrip()
+    if not stripped.endswith(b']'):
+        raise ValueError("existing trade log is not a JSON array")
+    
+    # Position of the closing bracket; the array is empty if '[' precedes it
+    f.seek(end - len(tail) + len(stripped) - 1)
+    separator = b'' if stripped[:-1].rstrip().endswith(b'[') else b',\n'
+    f.write(separator + record + b']\n')
+    f.truncate()
+
+
+def log_trade(trade_data: Dict[str, Any], log_file: str = "trades.jsonl"):
     """
     Log trade to file
     
+    Trades are appended as newline-delimited JSON (one object per line) by
+    default. A log_file ending in '.json' is kept as a single JSON array and
+    extended in place. Either way, logging cost doesn't grow with the size
+    of the history.
+    
     Args:
         trade_data: Dictionary containing trade information
         log_file: File path to log to
     """
-    trade_data['timestamp'] = datetime.now().isoformat()
+    # Human-readable time is derived here, off the execution path, when the
+    # trade already carries an integer time.time_ns() stamp. Both branches
+    # write local naive time, as datetime.now().isoformat() always has.
+    timestamp_ns = trade_data.get('timestamp_ns')
+    if timestamp_ns is not None:
+        seconds, ns = divmod(timestamp_ns, 1_000_000_000)
+        timestamp = datetime.fromtimestamp(seconds).replace(microsecond=ns // 1000)
+        trade_data['timestamp'] = timestamp.isoformat()
+    else:
+        trade_data['timestamp'] = datetime.now().isoformat()
     
     try:
-        # Read existing trades
-        try:
-            with open(log_file, 'r') as f:
-                trades = json.load(f)
-        except FileNotFoundError:
-            trades = []
-        
-        # Append new trade
-        trades.append(trade_data)
-        
-        # Write back
-        with open(log_file, 'w') as f:
-            json.dump(trades, f, indent=2)
-            
+        record = _json_line(trade_data)
+        if log_file.endswith('.json'):
+            with os.fdopen(os.open(log_file, os.O_RDWR | os.O_CREAT, 0o644), 'r+b') as f:
+                with _file_lock(f):
+                    _append_to_json_array(f, record.rstrip(b'\n'))
+        else:
+            with open(log_file, 'ab') as f:
+                with _file_lock(f):
+                    f.write(record)
     except Exception as e:
         logger.error(f"Error logging trade: {e}")
 
+
+def load_trades(log_file: str = "trades.jsonl") -> Iterator[Dict[str, Any]]:
+    """
+    Stream trades from a trade log
+    
+    Args:
+        log_file: File path written by log_trade() (JSONL, or a JSON array if it ends in '.json')
+        
+    Yields:
+        Trade dictionaries, oldest first
+    """
+    with open(log_file, 'r') as f:
+        if log_file.endswith('.json'):
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -10,40 +10,46 @@ import sys
 import os
 import time
 from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Optional
 
-# Add shared modules to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.abspath(os.path.join(current_dir, '..', '..', '..'))
-shared_python_path = os.path.join(project_root, 'shared', 'python')
-if os.path.exists(shared_python_path) and shared_python_path not in sys.path:
+# Add shared modules to path (detector.py and executor.py rely on this too)
+project_root = Path(__file__).resolve().parents[3]
+shared_python_path = str(project_root / 'shared' / 'python')
+if shared_python_path not in sys.path:
     sys.path.insert(0, shared_python_path)
 
+import requests
 from dotenv import load_dotenv
-from polymarket_client import PolyMarketClient
+from polymarket_client import PolyMarketClient, WEBSOCKETS_AVAILABLE
+from cache import MarketCache
 from utils import setup_logging, format_currency, format_percentage
-from detector import ArbitrageDetector
+from detector import ArbitrageDetector, Opportunity
+from detector_kernels import warm_up as warm_up_kernels
 from executor import ArbitrageExecutor
 
-# Paper trading import (optional - only if paper_trading.py exists)
-try:
-    from paper_trading import PaperTradingClient
-    PAPER_TRADING_AVAILABLE = True
-except ImportError:
-    PAPER_TRADING_AVAILABLE = False
-
-# Load environment variables from project root
-env_path = os.path.join(project_root, '.env')
-load_dotenv(dotenv_path=env_path)
-
-# Setup logging
-setup_logging(
-    log_level=os.getenv("LOG_LEVEL", "INFO"),
-    log_file=os.getenv("LOG_FILE", "logs/arbitrage_bot.log")
-)
-
 logger = logging.getLogger(__name__)
 
+# Seconds between full market rescans. Keep this >= 1s: tight REST polling
+# burns CPU and rate limit for no benefit.
+DEFAULT_POLL_INTERVAL = 1.0
+
+# While the websocket feed is pushing price changes, full rescans are only a
+# safety net (and refresh the set of streamed markets)
+STREAM_RESCAN_INTERVAL = 5.0
+
+# Opportunities waiting for the executor task; new ones are dropped when full
+OPPORTUNITY_QUEUE_SIZE = 16
+
+# Network hiccups the scan loop just retries after a short pause
+TRANSIENT_SCAN_ERRORS = (
+    asyncio.TimeoutError,
+    TimeoutError,
+    ConnectionError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
 
 class ArbitrageBot:
     """Main arbitrage trading bot"""
@@ -60,7 +66,23 @@ class ArbitrageBot:
         self.client = None
         self.detector = None
         self.executor = None
-        self.scan_interval = float(os.getenv("ARBITRAGE_SCAN_INTERVAL", "0.1"))  # 100ms
+        self.scan_interval = float(
+            os.getenv("POLL_INTERVAL")
+            or os.getenv("ARBITRAGE_SCAN_INTERVAL")
+            or DEFAULT_POLL_INTERVAL
+        )
+        self.stream_prices = os.getenv("STREAM_PRICES", "true").lower() == "true"
+        self._price_task: Optional[asyncio.Task] = None
+        self._streamed_markets: frozenset = frozenset()
+        # Created in run() so they belong to the running event loop
+        self._opp_queue: Optional[asyncio.Queue] = None
+        self._executor_task: Optional[asyncio.Task] = None
+        # Next market list, fetched in the background while the loop waits
+        self._next_fetch: Optional[asyncio.Task] = None
+        self._last_fetch_duration = 0.0
+        # Set by _request_shutdown() to cut the scan loop's waits short
+        self._stop: Optional[asyncio.Event] = None
+        self._market_cache = MarketCache(ttl=float(os.getenv("MARKET_LIST_TTL_S", "0.5")))
         self.min_profit_pct = float(os.getenv("STRATEGY_1_MIN_PROFIT_MARGIN", "0.01"))
         self.max_position_size = float(os.getenv("STRATEGY_1_MAX_POSITION_SIZE", "1000.0"))
         
@@ -78,8 +100,13 @@ class ArbitrageBot:
         """Initialize API client and components"""
         try:
             if self.paper_trading:
-                if not PAPER_TRADING_AVAILABLE:
-                    raise ImportError("Paper trading module not available. Make sure paper_trading.py exists.")
+                # Imported here so live runs (and plain imports of this module) don't pay for it
+                try:
+                    from paper_trading import PaperTradingClient
+                except ImportError as e:
+                    raise ImportError(
+                        "Paper trading module not available. Make sure paper_trading.py exists."
+                    ) from e
                 
                 logger.info("=" * 60)
                 logger.info("🧪 PAPER TRADING MODE - No real trades will be executed")
@@ -87,7 +114,9 @@ class ArbitrageBot:
                 
                 # Use paper trading client
                 initial_balance = float(os.getenv("PAPER_TRADING_BALANCE", "10000.0"))
-                self.client = PaperTradingClient(initial_balance=initial_balance)
+                self.client = PaperTradingClient(
+                    initial_balance=initial_balance, use_real_data=True
+                )
             else:
                 logger.info("Initializing PolyMarket Arbitrage Bot (LIVE TRADING)...")
                 logger.warning("⚠️  REAL MONEY MODE - Trades will be executed on PolyMarket!")
@@ -101,6 +130,9 @@ class ArbitrageBot:
                 min_profit_pct=self.min_profit_pct
             )
             
+            # Compile the scan kernel now rather than on the first scan
+            warm_up_kernels()
+            
             # Initialize executor
             self.executor = ArbitrageExecutor(
                 client=self.client,
@@ -123,100 +155,284 @@ class ArbitrageBot:
     async def scan_for_arbitrage(self):
         """Continuously scan markets for arbitrage opportunities"""
         logger.info("Starting arbitrage scan loop...")
+        if self._stop is None:
+            self._stop = asyncio.Event()
         
         while self.running:
             try:
-                # Get all active markets
-                markets = self.client.get_markets(active=True)
+                # Get all active markets (usually already prefetched)
+                fetch, self._next_fetch = self._next_fetch, None
+                markets = await (fetch if fetch is not None else self._fetch_markets_async())
                 
                 if not markets:
                     logger.warning("No markets found")
-                    await asyncio.sleep(5)
+                    await self._wait(5)
                     continue
                 
-                # Scan for arbitrage
-                opportunities = self.detector.scan_markets(markets)
+                # Scan for arbitrage (only the best one is executed)
+                opportunities = self.detector.scan_markets(markets, top_k=1)
                 
                 self.stats['scans'] += 1
                 
                 if opportunities:
-                    self.stats['opportunities_found'] += len(opportunities)
-                    logger.info(f"Found {len(opportunities)} arbitrage opportunity(ies)")
+                    self.stats['opportunities_found'] += self.detector.last_match_count
+                    logger.info(
+                        "Found %d arbitrage opportunity(ies)", self.detector.last_match_count
+                    )
                     
-                    # Execute best opportunity
-                    best_opportunity = opportunities[0]
-                    logger.info(f"Best opportunity: {format_percentage(best_opportunity['profit_margin'])} profit")
-                    
-                    result = self.executor.execute_arbitrage(best_opportunity)
-                    
-                    if result:
-                        self.stats['trades_executed'] += 1
-                        self.stats['total_profit'] += result['expected_profit']
-                        
-                        if self.paper_trading:
-                            logger.info(f"📝 PAPER TRADE executed! Expected profit: {format_currency(result['expected_profit'])}")
-                        else:
-                            logger.info(f"✅ LIVE TRADE executed! Expected profit: {format_currency(result['expected_profit'])}")
+                    # Hand the best one to the executor task and keep scanning
+                    self._queue_opportunity(opportunities[0])
+                
+                # Push-based updates between rescans
+                streaming = self._ensure_price_stream(markets)
                 
                 # Log stats periodically
                 if self.stats['scans'] % 100 == 0:
                     self.log_stats()
                 
-                # Small delay to avoid rate limiting
-                await asyncio.sleep(self.scan_interval)
+                # Small delay to avoid rate limiting. The next fetch starts
+                # early enough to finish as the delay ends, so the network
+                # round trip overlaps the wait instead of following it.
+                delay = self.scan_interval
+                if streaming:
+                    delay = max(delay, STREAM_RESCAN_INTERVAL)
+                self._next_fetch = asyncio.create_task(
+                    self._fetch_markets_async(start_in=max(0.0, delay - self._last_fetch_duration))
+                )
+                await self._wait(delay)
                 
-            except KeyboardInterrupt:
-                logger.info("Received interrupt signal")
-                self.shutdown()
-                break
+            except TRANSIENT_SCAN_ERRORS as e:
+                # Expected now and then - no traceback, retry soon
+                logger.warning("Transient scan error: %s", e)
+                await self._wait(1)
                 
-            except Exception as e:
-                logger.error(f"Error in arbitrage scan: {e}", exc_info=True)
-                await asyncio.sleep(5)  # Wait longer on error
+            except Exception:
+                logger.exception("Unexpected error in arbitrage scan")
+                await self._wait(5)  # Wait longer on error
+        
+        logger.info("Shutting down bot...")
+        self.log_stats()
+    
+    async def _wait(self, delay: float):
+        """Sleep for delay seconds, or less if shutdown is requested meanwhile"""
+        try:
+            await asyncio.wait_for(self._stop.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _fetch_markets_async(self, start_in: float = 0.0) -> List[Dict]:
+        """
+        Run _fetch_markets() in a worker thread so the event loop (executor
+        task, price stream) keeps running during the HTTP round trip
+        
+        Args:
+            start_in: Seconds to wait before fetching
+            
+        Returns:
+            List of market dictionaries
+        """
+        if start_in > 0:
+            await asyncio.sleep(start_in)
+        started = time.monotonic()
+        markets = await asyncio.to_thread(self._fetch_markets)
+        self._last_fetch_duration = time.monotonic() - started
+        return markets
+    
+    def _fetch_markets(self) -> List[Dict]:
+        """
+        Get active markets, reusing the last list while it's fresh or unchanged
+        
+        Returns:
+            List of market dictionaries
+        """
+        markets = self._market_cache.get()
+        if markets is not None:
+            return markets
+        
+        markets = self.client.get_markets(active=True, if_none_match=self._market_cache.etag)
+        if markets is None:
+            # 304 Not Modified - the previous list is still current
+            markets = self._market_cache.markets or []
+        self._market_cache.put(markets, getattr(self.client, 'markets_etag', None))
+        return markets
+    
+    def _queue_opportunity(self, opportunity: Opportunity):
+        """Queue an opportunity for the executor task (dropped if the queue is full)"""
+        try:
+            self._opp_queue.put_nowait(opportunity)
+        except asyncio.QueueFull:
+            logger.debug("Opportunity queue full, dropping %s", opportunity.market_id)
+    
+    async def _run_executor(self):
+        """Execute queued opportunities one at a time, in the order they were found"""
+        while True:
+            opportunity = await self._opp_queue.get()
+            try:
+                await self._execute_opportunity(opportunity)
+            except Exception:
+                logger.exception("Unexpected error executing opportunity")
+            finally:
+                self._opp_queue.task_done()
+    
+    async def _stop_executor(self):
+        """Drop queued opportunities, let the one in flight finish, then stop the executor task"""
+        while not self._opp_queue.empty():
+            self._opp_queue.get_nowait()
+            self._opp_queue.task_done()
+        await self._opp_queue.join()
+        self._executor_task.cancel()
+    
+    async def _execute_opportunity(self, opportunity: Opportunity):
+        """Execute an opportunity and record the result"""
+        logger.info(f"Best opportunity: {format_percentage(opportunity.profit_margin)} profit")
+        
+        result = await self.executor.execute_arbitrage(opportunity)
+        
+        if result:
+            self.stats['trades_executed'] += 1
+            self.stats['total_profit'] += result['expected_profit']
+            
+            if self.paper_trading:
+                logger.info(
+                    "📝 PAPER TRADE executed! Expected profit: %s",
+                    format_currency(result['expected_profit'])
+                )
+            else:
+                logger.info(
+                    "✅ LIVE TRADE executed! Expected profit: %s",
+                    format_currency(result['expected_profit'])
+                )
+    
+    def _ensure_price_stream(self, markets: List[Dict]) -> bool:
+        """
+        Start (or restart) the websocket price stream for the current market set
+        
+        Returns:
+            True if price updates are being streamed
+        """
+        if not self.stream_prices or not WEBSOCKETS_AVAILABLE:
+            return False
+        if not hasattr(self.client, 'subscribe_prices'):
+            return False
+        
+        market_ids = frozenset(m.get('condition_id') or m.get('id') for m in markets)
+        if self._price_task is not None and market_ids == self._streamed_markets:
+            # A finished task means nothing could be streamed for this market set
+            return not self._price_task.done()
+        
+        if self._price_task is not None:
+            self._price_task.cancel()
+        self._streamed_markets = market_ids
+        self._price_task = asyncio.create_task(
+            self.client.subscribe_prices(markets, on_message=self._on_price_update)
+        )
+        self._price_task.add_done_callback(self._on_price_task_done)
+        return True
+    
+    @staticmethod
+    def _on_price_task_done(task: asyncio.Task):
+        """Log why the price stream ended (this also retrieves the task's exception)"""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.warning("Price stream stopped: %s", error)
+    
+    async def _on_price_update(self, market: Dict):
+        """Check the single market whose price just changed"""
+        try:
+            opportunity = self.detector.detect_arbitrage(market)
+        except (TypeError, ValueError) as e:
+            logger.debug("Skipping price update with malformed prices: %s", e)
+            return
+        if opportunity:
+            self.stats['opportunities_found'] += 1
+            self._queue_opportunity(opportunity)
     
     def log_stats(self):
-        """Log current statistics"""
+        """Log current statistics (as a single multi-line record)"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         runtime = datetime.now() - self.stats['start_time']
         mode = "🧪 PAPER TRADING" if self.paper_trading else "💰 LIVE TRADING"
         
-        logger.info("=" * 50)
-        logger.info(f"Bot Statistics ({mode}):")
-        logger.info(f"  Runtime: {runtime}")
-        logger.info(f"  Scans: {self.stats['scans']}")
-        logger.info(f"  Opportunities found: {self.stats['opportunities_found']}")
-        logger.info(f"  Trades executed: {self.stats['trades_executed']}")
-        logger.info(f"  Total expected profit: {format_currency(self.stats['total_profit'])}")
+        lines = [
+            "=" * 50,
+            f"Bot Statistics ({mode}):",
+            f"  Runtime: {runtime}",
+            f"  Scans: {self.stats['scans']}",
+            f"  Opportunities found: {self.stats['opportunities_found']}",
+            f"  Trades executed: {self.stats['trades_executed']}",
+            f"  Total expected profit: {format_currency(self.stats['total_profit'])}"
+        ]
         
         if self.paper_trading and hasattr(self.client, 'get_statistics'):
             stats = self.client.get_statistics()
-            logger.info(f"  Current balance: {format_currency(stats['current_balance'])}")
-            logger.info(f"  Completed trades: {stats['completed_trades']}")
+            lines.append(f"  Current balance: {format_currency(stats['current_balance'])}")
+            lines.append(f"  Completed trades: {stats['completed_trades']}")
             if stats['total_invested'] > 0:
-                logger.info(f"  ROI: {stats['roi']:.2f}%")
+                lines.append(f"  ROI: {stats['roi']:.2f}%")
         
-        logger.info("=" * 50)
+        lines.append("=" * 50)
+        logger.info("\n".join(lines))
     
-    def shutdown(self, signum=None, frame=None):
-        """Graceful shutdown"""
-        logger.info("Shutting down bot...")
+    def _request_shutdown(self):
+        """Ask the scan loop to stop now; it logs the final stats on its way out"""
         self.running = False
-        self.log_stats()
+        if self._stop is not None:
+            self._stop.set()
     
     async def run(self):
         """Main bot loop"""
-        # Set up signal handlers
-        signal.signal(signal.SIGINT, self.shutdown)
-        signal.signal(signal.SIGTERM, self.shutdown)
+        # Set up signal handlers on the event loop, so they run as a normal
+        # callback rather than interrupting whatever the loop is doing
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._request_shutdown)
+            except NotImplementedError:
+                # Windows event loops don't support add_signal_handler; hand
+                # the request to the loop rather than touching it mid-callback
+                signal.signal(
+                    sig, lambda signum, frame: loop.call_soon_threadsafe(self._request_shutdown)
+                )
         
         # Initialize
         self.initialize()
         
+        # Execution runs in its own task so the next scan doesn't wait on orders
+        self._opp_queue = asyncio.Queue(maxsize=OPPORTUNITY_QUEUE_SIZE)
+        self._executor_task = asyncio.create_task(self._run_executor())
+        
         # Start scanning
-        await self.scan_for_arbitrage()
+        try:
+            await self.scan_for_arbitrage()
+        finally:
+            if self._price_task is not None:
+                self._price_task.cancel()
+            if self._next_fetch is not None:
+                self._next_fetch.cancel()
+            await self._stop_executor()
+            if hasattr(self.client, 'close_async'):
+                await self.client.close_async()
+
+
+def _bootstrap():
+    """Load .env from the project root and configure logging (entry point only, not on import)"""
+    load_dotenv(dotenv_path=os.path.join(project_root, '.env'))
+    
+    setup_logging(
+        log_level=os.getenv("LOG_LEVEL", "INFO"),
+        log_file=os.getenv("LOG_FILE", "logs/arbitrage_bot.log")
+    )
 
 
 def main():
     """Entry point"""
+    _bootstrap()
+    
     # Check for paper trading mode
     paper_trading = os.getenv("PAPER_TRADING", "false").lower() == "true"
     
@@ -231,8 +447,15 @@ def main():
     
     bot = ArbitrageBot(paper_trading=paper_trading)
     
+    # Prefer the libuv-backed event loop when it is installed
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    
     try:
-        asyncio.run(bot.run())
+        run(bot.run())
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
@@ -2,23 +2,55 @@
 Arbitrage Detection Module
 Detects risk-free arbitrage opportunities in PolyMarket
 """
+import heapq
 import logging
-from typing import Optional, Dict, List
-import sys
-import os
+from typing import Optional, Dict, List, NamedTuple
 
-# Add shared modules to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.abspath(os.path.join(current_dir, '..', '..', '..'))
-shared_python_path = os.path.join(project_root, 'shared', 'python')
-if os.path.exists(shared_python_path) and shared_python_path not in sys.path:
-    sys.path.insert(0, shared_python_path)
+import numpy as np
 
 from polymarket_client import PolyMarketClient
-from utils import calculate_profit_margin
+from utils import calculate_profit_margin, MIN_PROFIT_THRESHOLD
+from detector_kernels import scan_into
 
 logger = logging.getLogger(__name__)
 
+# Initial capacity of the reusable price buffers (Gamma returns up to 500 markets)
+INITIAL_BUFFER_SIZE = 1024
+
+
+def _numeric_column(values: List) -> np.ndarray:
+    """Convert prices to an array, raising TypeError unless every value is a number"""
+    column = np.asarray(values)
+    if column.dtype.kind not in 'biuf':
+        raise TypeError(f"non-numeric price in column of dtype {column.dtype}")
+    return column
+
+
+class Opportunity(NamedTuple):
+    """A detected arbitrage: buying one YES and one NO share costs total_cost"""
+    market_id: str
+    market_description: str
+    yes_price: float
+    no_price: float
+    total_cost: float
+    profit_margin: float
+    shares_per_dollar: float
+    
+    @property
+    def profit_pct(self) -> float:
+        """Profit margin as a percentage"""
+        return self.profit_margin * 100
+    
+    @property
+    def profit_per_dollar(self) -> float:
+        """Expected profit per dollar invested (same as profit_margin)"""
+        return self.profit_margin
+    
+    @property
+    def is_arbitrage(self) -> bool:
+        """Always True; kept for callers that check the flag"""
+        return True
+
 
 class ArbitrageDetector:
     """Detects arbitrage opportunities in PolyMarket"""
@@ -35,8 +67,21 @@ class ArbitrageDetector:
         self.client = client
         self.min_profit_pct = min_profit_pct
         self.fee_rate = fee_rate
+        
+        # Any market whose YES+NO total reaches this can't clear the fee and
+        # profit thresholds. The 2bp slack covers calculate_profit_margin()'s
+        # 1bp price quantization, so the fast reject never drops a real hit.
+        min_margin = max(MIN_PROFIT_THRESHOLD, min_profit_pct)
+        self._reject_threshold = (1.0 - min_margin) / (1.0 + fee_rate) + 0.0002
+        
+        # Column buffers reused by every scan; grown (doubled) only when needed
+        self._yes = np.empty(INITIAL_BUFFER_SIZE, np.float64)
+        self._no = np.empty_like(self._yes)
+        self._margin = np.empty_like(self._yes)
+        self._keep = np.empty(INITIAL_BUFFER_SIZE, np.bool_)
+        self.last_match_count = 0
     
-    def detect_arbitrage(self, market: Dict) -> Optional[Dict]:
+    def detect_arbitrage(self, market: Dict) -> Optional[Opportunity]:
         """
         Detect if a market presents an arbitrage opportunity
         
@@ -44,75 +89,153 @@ class ArbitrageDetector:
             market: Market dictionary with price information
             
         Returns:
-            Arbitrage opportunity dict or None
+            Opportunity or None
+            
+        Raises TypeError or ValueError if a price is malformed; use
+        _detect_arbitrage_safe() for untrusted market data.
         """
+        yes_price = market.get('yes_price', 0.0)
+        no_price = market.get('no_price', 0.0)
+        
+        # Cheapest reject first: nearly every market is priced above break-even,
+        # so a single compare rules it out before any fee math
+        if yes_price + no_price >= self._reject_threshold or yes_price <= 0 or no_price <= 0:
+            return None
+        
+        # Exact check (profitable after fees and above the minimum margin)
+        is_profitable, profit_margin = calculate_profit_margin(yes_price, no_price, self.fee_rate)
+        if not is_profitable or profit_margin < self.min_profit_pct:
+            return None
+        
+        return self._build_opportunity(market, yes_price, no_price, profit_margin)
+    
+    def _detect_arbitrage_safe(self, market: Dict) -> Optional[Opportunity]:
+        """detect_arbitrage() that logs and skips malformed markets instead of raising"""
         try:
-            # Get prices
-            yes_price = market.get('yes_price', 0.0)
-            no_price = market.get('no_price', 0.0)
-            
-            if yes_price <= 0 or no_price <= 0:
-                return None
-            
-            # Check if profitable after fees
-            is_profitable, profit_margin = calculate_profit_margin(
-                yes_price, 
-                no_price, 
-                self.fee_rate
-            )
-            
-            if not is_profitable:
-                return None
-            
-            # Check if profit margin meets minimum threshold
-            if profit_margin < self.min_profit_pct:
-                return None
-            
-            # Calculate expected profit
-            total_cost = yes_price + no_price
-            shares_per_dollar = 1.0 / total_cost
-            profit_per_dollar = profit_margin
-            
-            return {
-                'market_id': market.get('id') or market.get('market_id'),
-                'market_description': market.get('description', 'Unknown'),
-                'yes_price': yes_price,
-                'no_price': no_price,
-                'total_cost': total_cost,
-                'profit_margin': profit_margin,
-                'profit_pct': profit_margin * 100,
-                'shares_per_dollar': shares_per_dollar,
-                'profit_per_dollar': profit_per_dollar,
-                'is_arbitrage': True
-            }
-            
+            return self.detect_arbitrage(market)
         except Exception as e:
             logger.error(f"Error detecting arbitrage for market {market.get('id')}: {e}")
             return None
     
-    def scan_markets(self, markets: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _build_opportunity(
+        market: Dict, yes_price: float, no_price: float, profit_margin: float
+    ) -> Opportunity:
+        """Build the opportunity record for a market that passed detection"""
+        total_cost = yes_price + no_price
+        
+        return Opportunity(
+            market_id=market.get('id') or market.get('market_id'),
+            market_description=market.get('description', 'Unknown'),
+            yes_price=yes_price,
+            no_price=no_price,
+            total_cost=total_cost,
+            profit_margin=profit_margin,
+            shares_per_dollar=1.0 / total_cost
+        )
+    
+    def _ensure_capacity(self, n: int):
+        """Grow the column buffers to hold at least n markets"""
+        capacity = self._yes.shape[0]
+        if n <= capacity:
+            return
+        while capacity < n:
+            capacity *= 2
+        self._yes = np.empty(capacity, np.float64)
+        self._no = np.empty_like(self._yes)
+        self._margin = np.empty_like(self._yes)
+        self._keep = np.empty(capacity, np.bool_)
+    
+    def _extract_price_arrays(self, markets: List[Dict]):
+        """
+        Write YES/NO prices from market dicts into the reusable column buffers
+        
+        Raises TypeError if a price isn't a number. Numeric strings are
+        rejected too rather than coerced, as detect_arbitrage() does.
+        
+        Returns:
+            Tuple of (yes_prices, no_prices) views of length len(markets)
+        """
+        n = len(markets)
+        self._ensure_capacity(n)
+        yes_prices = self._yes[:n]
+        no_prices = self._no[:n]
+        yes_prices[:] = _numeric_column([m.get('yes_price', 0.0) for m in markets])
+        no_prices[:] = _numeric_column([m.get('no_price', 0.0) for m in markets])
+        return yes_prices, no_prices
+    
+    def scan_markets(self, markets: List[Dict], top_k: Optional[int] = None) -> List[Opportunity]:
         """
         Scan multiple markets for arbitrage opportunities
         
+        Prices are checked in one compiled pass (detector_kernels.scan_into,
+        multi-threaded for large lists);
+        Opportunity records are only built for the markets that are returned.
+        The total number of matches is kept in self.last_match_count.
+        
         Args:
             markets: List of market dictionaries
+            top_k: Only return the best top_k opportunities (default: all).
+                Selecting them is a partial sort, not a full one.
             
         Returns:
-            List of arbitrage opportunities
+            List of arbitrage opportunities, best first
         """
-        opportunities = []
+        self.last_match_count = 0
+        if not markets:
+            return []
+        
+        try:
+            yes_prices, no_prices = self._extract_price_arrays(markets)
+        except (TypeError, ValueError):
+            # Malformed prices somewhere - check market by market so one bad row is skipped
+            opportunities = [o for o in map(self._detect_arbitrage_safe, markets) if o]
+            self.last_match_count = len(opportunities)
+            if top_k is not None:
+                return heapq.nlargest(top_k, opportunities, key=lambda x: x.profit_margin)
+            opportunities.sort(key=lambda x: x.profit_margin, reverse=True)
+            return opportunities
+        
+        n = len(markets)
+        keep = self._keep[:n]
+        profit_margin = self._margin[:n]
+        self.last_match_count = scan_into(
+            yes_prices, no_prices, self.fee_rate, self.min_profit_pct, MIN_PROFIT_THRESHOLD,
+            keep, profit_margin
+        )
+        if not self.last_match_count:
+            return []
         
-        for market in markets:
-            opportunity = self.detect_arbitrage(market)
-            if opportunity:
-                opportunities.append(opportunity)
+        idx = np.flatnonzero(keep)
+        if top_k is not None and top_k < idx.size:
+            idx = idx[self._top_k_positions(profit_margin[idx], top_k)]
         
-        # Sort by profit margin (highest first)
-        opportunities.sort(key=lambda x: x['profit_margin'], reverse=True)
+        # Sort by profit margin (highest first); stable, so ties keep input order
+        idx = idx[np.argsort(-profit_margin[idx], kind='stable')]
         
-        return opportunities
+        return [
+            self._build_opportunity(
+                markets[i], float(yes_prices[i]), float(no_prices[i]), float(profit_margin[i])
+            )
+            for i in idx.tolist()
+        ]
+    
+    @staticmethod
+    def _top_k_positions(margins: np.ndarray, top_k: int) -> np.ndarray:
+        """
+        Positions of the top_k largest margins, in input order
+        
+        Uses np.partition (O(n)); ties at the cut-off go to the earliest
+        positions, matching what a stable full sort would keep.
+        """
+        if top_k <= 0:
+            return np.empty(0, np.intp)
+        kth = np.partition(margins, margins.size - top_k)[margins.size - top_k]
+        above = np.flatnonzero(margins > kth)
+        ties = np.flatnonzero(margins == kth)[:top_k - above.size]
+        return np.sort(np.concatenate((above, ties)))
     
-    def get_market_prices(self, market_id: str) -> Optional[Dict]:
+    def get_market_prices(self, market_id: str) -> Optional[Opportunity]:
         """
         Get current prices for a market and check for arbitrage
         
@@ -132,5 +255,5 @@ class ArbitrageDetector:
             'no_price': prices['no_price']
         }
         
-        return self.detect_arbitrage(market)
+        return self._detect_arbitrage_safe(market)
 
@@ -0,0 +1,133 @@
+"""
+Arbitrage Detection Kernels
+Compiled inner loops for the detector (plain Python if numba isn't installed)
+"""
+import numpy as np
+
+from jit import njit, prange
+from utils import profit_margin_from_bp
+
+
+# Below this many markets, starting the worker threads costs more than the
+# parallel loop saves
+PARALLEL_SCAN_MIN_MARKETS = 512
+
+
+# These kernels inline utils.profit_margin_from_bp(). numba's on-disk cache only
+# tracks the file a kernel is defined in, so they are compiled fresh each run
+# (see warm_up()) instead of using cache=True.
+@njit(inline='always')
+def _market_margin(
+    yes_price: float, no_price: float, fee_rate: float, min_profit_threshold: float
+) -> float:
+    """
+    Profit margin for one market, or 0.0 if it doesn't clear min_profit_threshold
+    
+    Prices are quantized to 1bp and passed to utils.profit_margin_from_bp(),
+    the rule calculate_profit_margin() uses.
+    """
+    if not (yes_price > 0.0 and no_price > 0.0):
+        return 0.0
+    
+    return profit_margin_from_bp(
+        np.rint(yes_price * 10000.0), np.rint(no_price * 10000.0), fee_rate, min_profit_threshold
+    )
+
+
+@njit(boundscheck=False)
+def scan_kernel_into(
+    yes_prices: np.ndarray,
+    no_prices: np.ndarray,
+    fee_rate: float,
+    min_profit_pct: float,
+    min_profit_threshold: float,
+    keep: np.ndarray,
+    margin: np.ndarray
+) -> int:
+    """
+    Check every market for a profitable arbitrage in one compiled loop
+    
+    A market is kept when its margin clears both min_profit_threshold and
+    min_profit_pct. fastmath is deliberately off so results match the scalar
+    path bit for bit.
+    
+    Args:
+        yes_prices: float64 array of YES prices
+        no_prices: float64 array of NO prices
+        fee_rate: Trading fee rate
+        min_profit_pct: Minimum profit margin required
+        min_profit_threshold: Margin floor every trade must clear
+            (utils.MIN_PROFIT_THRESHOLD)
+        keep: Output bool array (same length), True where profitable
+        margin: Output float64 array (same length), 0.0 where not profitable
+        
+    Returns:
+        Number of markets kept
+    """
+    kept = 0
+    for i in range(yes_prices.shape[0]):
+        profit_margin = _market_margin(yes_prices[i], no_prices[i], fee_rate, min_profit_threshold)
+        margin[i] = profit_margin
+        keep[i] = profit_margin > 0.0 and profit_margin >= min_profit_pct
+        if keep[i]:
+            kept += 1
+    
+    return kept
+
+
+@njit(boundscheck=False, parallel=True)
+def scan_kernel_into_parallel(
+    yes_prices: np.ndarray,
+    no_prices: np.ndarray,
+    fee_rate: float,
+    min_profit_pct: float,
+    min_profit_threshold: float,
+    keep: np.ndarray,
+    margin: np.ndarray
+) -> int:
+    """
+    Multi-threaded scan_kernel_into() for large market lists
+    
+    Markets are independent, so the loop is split across cores with prange.
+    Only worth it above PARALLEL_SCAN_MIN_MARKETS (see scan_into()).
+    """
+    kept = 0
+    for i in prange(yes_prices.shape[0]):
+        profit_margin = _market_margin(yes_prices[i], no_prices[i], fee_rate, min_profit_threshold)
+        margin[i] = profit_margin
+        ok = profit_margin > 0.0 and profit_margin >= min_profit_pct
+        keep[i] = ok
+        if ok:
+            kept += 1
+    
+    return kept
+
+
+def scan_into(
+    yes_prices: np.ndarray,
+    no_prices: np.ndarray,
+    fee_rate: float,
+    min_profit_pct: float,
+    min_profit_threshold: float,
+    keep: np.ndarray,
+    margin: np.ndarray
+) -> int:
+    """
+    Run the parallel kernel for large inputs and the serial one otherwise
+    
+    Arguments and return value are the same as scan_kernel_into().
+    """
+    if yes_prices.shape[0] > PARALLEL_SCAN_MIN_MARKETS:
+        return scan_kernel_into_parallel(
+            yes_prices, no_prices, fee_rate, min_profit_pct, min_profit_threshold, keep, margin
+        )
+    return scan_kernel_into(
+        yes_prices, no_prices, fee_rate, min_profit_pct, min_profit_threshold, keep, margin
+    )
+
+
+def warm_up():
+    """Compile the serial and parallel kernels so the first scan isn't slow"""
+    for n in (1, PARALLEL_SCAN_MIN_MARKETS + 1):
+        prices = np.ones(n, np.float64)
+        scan_into(prices, prices, 0.02, 0.01, 0.01, np.empty(n, np.bool_), np.empty(n, np.float64))
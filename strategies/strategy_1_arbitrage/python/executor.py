@@ -5,18 +5,17 @@ Handles execution of arbitrage trades
 import logging
 import asyncio
 from typing import Dict, Optional, Tuple
-from datetime import datetime
-import sys
-import os
-
-# Add shared modules to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..', 'shared', 'python'))
+import time
 
 from polymarket_client import PolyMarketClient
-from utils import format_currency, format_percentage, log_trade
+from detector import Opportunity
+from utils import log_trade
 
 logger = logging.getLogger(__name__)
 
+# How long a locally tracked balance is trusted before resyncing with the client
+BALANCE_CACHE_TTL = 30.0
+
 
 class ArbitrageExecutor:
     """Executes arbitrage trades"""
@@ -38,119 +37,165 @@ class ArbitrageExecutor:
         self.client = client
         self.max_position_size = max_position_size
         self.max_slippage_pct = max_slippage_pct
+        self._abs_min = 100.0  # Minimum position size in USD
         self.executed_trades = []
+        self._balance_cache: Optional[Tuple[float, float]] = None  # (balance, fetched_at)
+    
+    def _get_cached_balance(self, ttl: float = BALANCE_CACHE_TTL) -> float:
+        """
+        Get available balance, only asking the client once per TTL
+        
+        Between resyncs the balance is tracked locally: fills decrement it and
+        rejected orders invalidate it.
+        
+        Args:
+            ttl: Seconds before the balance is fetched again
+            
+        Returns:
+            Available balance in USD
+        """
+        now = time.monotonic()
+        if self._balance_cache is not None and now - self._balance_cache[1] < ttl:
+            return self._balance_cache[0]
+        
+        balance = self.client.get_balance()
+        self._balance_cache = (balance, now)
+        return balance
     
-    def calculate_position_size(self, opportunity: Dict, available_capital: float) -> float:
+    def calculate_position_size(self, opportunity: Opportunity, available_capital: float) -> float:
         """
         Calculate position size for arbitrage trade
         
         Args:
-            opportunity: Arbitrage opportunity dict
+            opportunity: Arbitrage opportunity
             available_capital: Available capital in USD
             
         Returns:
             Position size in USD
         """
-        # Base position size
-        base_size = min(self.max_position_size, available_capital * 0.1)  # Max 10% of capital
-        
-        # Scale up for better opportunities
-        profit_margin = opportunity['profit_margin']
-        scaled_size = base_size * (1 + profit_margin * 10)
+        # 10% of capital, scaled up for better opportunities, then capped at
+        # the max position size and 20% of capital. Same result as capping the
+        # base at max_position_size first, since profit margins are positive.
+        size = available_capital * 0.1 * (1.0 + 10.0 * opportunity.profit_margin)
+        if size > self.max_position_size:
+            size = self.max_position_size
+        cap = available_capital * 0.2
+        if size > cap:
+            size = cap
         
-        # Cap at max position size
-        position_size = min(scaled_size, self.max_position_size, available_capital * 0.2)
-        
-        return max(position_size, 100.0)  # Minimum $100
+        return size if size > self._abs_min else self._abs_min  # Minimum $100
     
-    def execute_arbitrage(self, opportunity: Dict) -> Optional[Dict]:
+    async def execute_arbitrage(self, opportunity: Opportunity) -> Optional[Dict]:
         """
         Execute arbitrage trade by buying both YES and NO shares
         
+        Both legs are submitted concurrently so the second leg's price has
+        less time to move; if only one leg goes through it is cancelled.
+        
         Args:
-            opportunity: Arbitrage opportunity dict
+            opportunity: Arbitrage opportunity
             
         Returns:
             Trade result dict or None
         """
         try:
             # Get available balance
-            balance = self.client.get_balance()
+            balance = self._get_cached_balance()
             
             if balance < 100:
-                logger.warning(f"Insufficient balance: {format_currency(balance)}")
+                logger.warning("Insufficient balance: $%.2f", balance)
                 return None
             
             # Calculate position size
             position_size = self.calculate_position_size(opportunity, balance)
             
             # Calculate number of shares
-            total_cost = opportunity['total_cost']
+            total_cost = opportunity.total_cost
             shares = position_size / total_cost
             
-            logger.info(f"Executing arbitrage:")
-            logger.info(f"  Market: {opportunity['market_description']}")
-            logger.info(f"  YES price: ${opportunity['yes_price']:.4f}")
-            logger.info(f"  NO price: ${opportunity['no_price']:.4f}")
-            logger.info(f"  Position size: {format_currency(position_size)}")
-            logger.info(f"  Shares: {shares:.2f}")
-            logger.info(f"  Expected profit: {format_percentage(opportunity['profit_margin'])}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Executing arbitrage | market=%s yes=$%.4f no=$%.4f size=$%.2f "
+                    "shares=%.2f expected_profit=%.2f%%",
+                    opportunity.market_description,
+                    opportunity.yes_price,
+                    opportunity.no_price,
+                    position_size,
+                    shares,
+                    opportunity.profit_margin * 100
+                )
             
             # Place both orders simultaneously
-            yes_order = self.client.place_order(
-                market_id=opportunity['market_id'],
-                side='BUY',
-                price=opportunity['yes_price'] * (1 + self.max_slippage_pct),  # Allow slippage
-                size=shares,
-                order_type='LIMIT'
+            yes_order, no_order = await asyncio.gather(
+                self.client.place_order_async(
+                    market_id=opportunity.market_id,
+                    side='BUY',
+                    price=opportunity.yes_price * (1 + self.max_slippage_pct),  # Allow slippage
+                    size=shares,
+                    order_type='LIMIT'
+                ),
+                self.client.place_order_async(
+                    market_id=opportunity.market_id,
+                    side='BUY',
+                    price=opportunity.no_price * (1 + self.max_slippage_pct),  # Allow slippage
+                    size=shares,
+                    order_type='LIMIT'
+                ),
+                return_exceptions=True
             )
             
-            no_order = self.client.place_order(
-                market_id=opportunity['market_id'],
-                side='BUY',
-                price=opportunity['no_price'] * (1 + self.max_slippage_pct),  # Allow slippage
-                size=shares,
-                order_type='LIMIT'
-            )
+            for order in (yes_order, no_order):
+                if isinstance(order, Exception):
+                    logger.error("Order placement raised: %s", order)
+            yes_order = None if isinstance(yes_order, Exception) else yes_order
+            no_order = None if isinstance(no_order, Exception) else no_order
             
             if not yes_order or not no_order:
                 logger.error("Failed to place one or both orders")
+                # Resync the balance next time rather than trust the local copy
+                self._balance_cache = None
                 # Cancel the other order if one failed
                 if yes_order:
-                    self.client.cancel_order(yes_order.get('id'))
+                    await self.client.cancel_order_async(yes_order.get('id'))
                 if no_order:
-                    self.client.cancel_order(no_order.get('id'))
+                    await self.client.cancel_order_async(no_order.get('id'))
                 return None
             
             # Record trade
             trade_result = {
                 'type': 'arbitrage',
-                'market_id': opportunity['market_id'],
-                'market_description': opportunity['market_description'],
+                'market_id': opportunity.market_id,
+                'market_description': opportunity.market_description,
                 'yes_order_id': yes_order.get('id'),
                 'no_order_id': no_order.get('id'),
-                'yes_price': opportunity['yes_price'],
-                'no_price': opportunity['no_price'],
+                'yes_price': opportunity.yes_price,
+                'no_price': opportunity.no_price,
                 'shares': shares,
                 'position_size': position_size,
-                'expected_profit': position_size * opportunity['profit_margin'],
-                'profit_margin': opportunity['profit_margin'],
-                'timestamp': datetime.now().isoformat(),
+                'expected_profit': position_size * opportunity.profit_margin,
+                'profit_margin': opportunity.profit_margin,
+                'timestamp_ns': time.time_ns(),
                 'status': 'executed'
             }
             
             self.executed_trades.append(trade_result)
+            if self._balance_cache is not None:
+                cached_balance, fetched_at = self._balance_cache
+                self._balance_cache = (cached_balance - position_size, fetched_at)
             
             # Log trade
             log_trade(trade_result)
             
-            logger.info(f"✅ Arbitrage executed successfully!")
-            logger.info(f"  Expected profit: {format_currency(trade_result['expected_profit'])}")
+            logger.info(
+                "✅ Arbitrage executed successfully! Expected profit: $%.2f",
+                trade_result['expected_profit']
+            )
             
             return trade_result
             
         except Exception as e:
-            logger.error(f"Error executing arbitrage: {e}", exc_info=True)
+            logger.error("Error executing arbitrage: %s", e, exc_info=True)
+            self._balance_cache = None
             return None
     
     def get_trade_history(self) -> list[Dict]:
@@ -4,11 +4,14 @@ Simulates trades without actually executing them on PolyMarket
 Perfect for testing strategies before deploying with real money
 """
 import logging
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple, Union
 from datetime import datetime
-import json
 import os
 import sys
+import threading
+import time
+
+import numpy as np
 
 # Add shared modules to path for real API access
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,90 +20,380 @@ shared_python_path = os.path.join(project_root, 'shared', 'python')
 if os.path.exists(shared_python_path) and shared_python_path not in sys.path:
     sys.path.insert(0, shared_python_path)
 
+from cache import TTLCache
+from paper_trading_kernels import resolve_kernel
+
 logger = logging.getLogger(__name__)
 
+# Bound once so the hot paths skip the module attribute lookups
+_time_ns = time.time_ns
+_fromtimestamp = datetime.fromtimestamp
+
+# Starting row capacity of the order/position/trade columns (doubled when full)
+INITIAL_CAPACITY = 1024
+
+# Resolved trades kept for the trades view; older ones are overwritten but
+# still count towards the statistics totals
+TRADE_HISTORY_SIZE = 65536
+
+# Integer codes for position sides, so the resolution kernel compares ints
+SIDE_CODES = {'YES': 1, 'NO': 2}
+UNKNOWN_SIDE_CODE = 0
+
+# Fixed-point scales: money is kept in integer cents, order prices in
+# millionths of a dollar and order sizes in ten-thousandths of a share
+PRICE_SCALE = 10**6
+SIZE_SCALE = 10**4
+CENTS_PER_DOLLAR = 100
+_COST_TO_CENTS = PRICE_SCALE * SIZE_SCALE // CENTS_PER_DOLLAR
+
+# Real API client shared by every PaperTradingClient (created on first use)
+_REAL_CLIENT = None
+_REAL_CLIENT_LOCK = threading.Lock()
+
+# How long market data fetched through the real client is reused (seconds)
+MARKET_DATA_TTL = 0.5
+
+
+def _grow(column: np.ndarray, n: int) -> np.ndarray:
+    """Return column, or a copy with doubled capacity if row n doesn't fit"""
+    if n < column.shape[0]:
+        return column
+    return np.resize(column, max(2 * column.shape[0], n + 1))
+
+
+def _to_cents(amount: float) -> int:
+    """Round a dollar amount to integer cents"""
+    return round(amount * CENTS_PER_DOLLAR)
+
+
+def _format_order_id(order_id: int) -> str:
+    """Turn an integer paper order id into the string id the API returns"""
+    return f"paper_order_{order_id}"
+
+
+def _get_real_client():
+    """
+    Get the shared read-only PolyMarketClient, creating it on first use
+    
+    Returns:
+        PolyMarketClient, or None if it could not be created (retried next time)
+    """
+    global _REAL_CLIENT
+    with _REAL_CLIENT_LOCK:
+        if _REAL_CLIENT is None:
+            try:
+                from polymarket_client import PolyMarketClient
+                _REAL_CLIENT = PolyMarketClient()
+                logger.info("Real API client initialized for market data (read-only)")
+            except Exception as e:
+                logger.warning("Could not initialize real API client: %s", e)
+                logger.warning("Paper trading will use mock data only")
+        return _REAL_CLIENT
+
+
+def _iso_timestamp(timestamp_ns: int) -> str:
+    """Format an epoch-nanosecond timestamp as local ISO time (like datetime.now().isoformat())"""
+    seconds, ns = divmod(timestamp_ns, 1_000_000_000)
+    return _fromtimestamp(seconds).replace(microsecond=ns // 1000).isoformat()
+
 
 class PaperTradingClient:
     """
     Mock PolyMarket client for paper trading
     Simulates all operations without real API calls
+    
+    Orders, positions and trades are stored column-wise: numeric fields in
+    preallocated numpy arrays (first _n_* rows are valid), string fields in
+    plain lists. The orders/positions/trades properties rebuild dicts on demand.
     """
     
-    def __init__(self, initial_balance: float = 10000.0):
+    __slots__ = (
+        'initial_balance', 'markets', 'real_client', '_balance_cents',
+        '_markets_indexed_at', '_market_cache', '_prices_cache',
+        '_n_orders', '_next_order_id', '_orders_id', '_orders_price', '_orders_size',
+        '_orders_cost_cents', '_orders_timestamp_ns', '_orders_market_id', '_orders_side',
+        '_n_positions', '_positions_shares', '_positions_cost', '_positions_total_cost',
+        '_positions_side_code', '_positions_by_market', '_positions_market_id', '_positions_side',
+        '_n_trades', '_trades_payout', '_trades_profit', '_trades_position', '_trades_timestamp_ns',
+        '_trades_total_payout', '_trades_total_profit',
+    )
+    
+    def __init__(
+        self,
+        initial_balance: float = 10000.0,
+        use_real_data: bool = False,
+        real_client: Any = None
+    ):
         """
         Initialize paper trading client
         
         Args:
             initial_balance: Starting balance in USD
+            use_real_data: Fetch market data through a PolyMarketClient shared by
+                all instances (default: mock data only)
+            real_client: Client to use for market data instead of the shared one
         """
-        self.balance = initial_balance
-        self.orders = []
-        self.positions = []
-        self.trades = []
+        self.initial_balance = initial_balance
+        self._balance_cents = _to_cents(initial_balance)
         self.markets = {}
+        self._markets_indexed_at = 0.0  # time.monotonic() of the last _index_markets()
+        self._market_cache = TTLCache(maxsize=4096, ttl=MARKET_DATA_TTL)
+        self._prices_cache = TTLCache(maxsize=4096, ttl=MARKET_DATA_TTL)
         
-        # Initialize real API client for market data (read-only)
+        # Orders
+        self._n_orders = 0
+        self._orders_price = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self._orders_size = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self._orders_cost_cents = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self._orders_timestamp_ns = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self._next_order_id = 0
+        self._orders_id = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self._orders_market_id: List[str] = []
+        self._orders_side: List[str] = []
+        
+        # Positions
+        self._n_positions = 0
+        self._positions_shares = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self._positions_cost = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self._positions_total_cost = 0.0
+        self._positions_side_code = np.empty(INITIAL_CAPACITY, dtype=np.int8)
+        self._positions_by_market: Dict[str, List[int]] = {}  # market_id -> position rows
+        self._positions_market_id: List[str] = []
+        self._positions_side: List[str] = []
+        
+        # Trades (resolved positions): a ring buffer, trade t lives in slot
+        # t % TRADE_HISTORY_SIZE. Market id and side come from the position row.
+        self._n_trades = 0
+        self._trades_payout = np.empty(TRADE_HISTORY_SIZE, dtype=np.float64)
+        self._trades_profit = np.empty(TRADE_HISTORY_SIZE, dtype=np.float64)
+        self._trades_position = np.empty(TRADE_HISTORY_SIZE, dtype=np.int64)
+        self._trades_timestamp_ns = np.empty(TRADE_HISTORY_SIZE, dtype=np.int64)
+        self._trades_total_payout = 0.0
+        self._trades_total_profit = 0.0
+        
+        # Real API client for market data (read-only)
         # This allows us to get real market data but simulate trades
-        try:
-            from polymarket_client import PolyMarketClient
-            self.real_client = PolyMarketClient()
-            logger.info("Real API client initialized for market data (read-only)")
-        except Exception as e:
-            logger.warning(f"Could not initialize real API client: {e}")
-            logger.warning("Paper trading will use mock data only")
-            self.real_client = None
+        if real_client is None and use_real_data:
+            real_client = _get_real_client()
+        self.real_client = real_client
         
-        logger.info(f"Paper trading initialized with ${initial_balance:,.2f}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Paper trading initialized with ${initial_balance:,.2f}")
     
-    def get_markets(self, active: bool = True) -> List[Dict]:
+    def reset(self, initial_balance: Optional[float] = None):
+        """
+        Forget all orders, positions, trades and cached market data
+        
+        The column arrays keep their capacity, so this is much cheaper than
+        building a new client.
+        
+        Args:
+            initial_balance: New starting balance (default: the current initial_balance)
+        """
+        if initial_balance is not None:
+            self.initial_balance = initial_balance
+        self._balance_cents = _to_cents(self.initial_balance)
+        self.markets.clear()
+        self._market_cache.invalidate()
+        self._prices_cache.invalidate()
+        
+        self._n_orders = 0
+        self._next_order_id = 0
+        self._orders_market_id.clear()
+        self._orders_side.clear()
+        
+        self._n_positions = 0
+        self._positions_by_market.clear()
+        self._positions_market_id.clear()
+        self._positions_side.clear()
+        
+        self._positions_total_cost = 0.0
+        
+        self._n_trades = 0
+        self._trades_total_payout = 0.0
+        self._trades_total_profit = 0.0
+    
+    @property
+    def balance(self) -> float:
+        """Available balance in USD (kept internally in integer cents)"""
+        return self._balance_cents / CENTS_PER_DOLLAR
+    
+    @balance.setter
+    def balance(self, amount: float):
+        self._balance_cents = _to_cents(amount)
+    
+    @property
+    def orders(self) -> Tuple[Dict, ...]:
+        """Placed orders, oldest first (a read-only snapshot; use place_order() to add)"""
+        return tuple(self._order_dict(i) for i in range(self._n_orders))
+    
+    @property
+    def positions(self) -> Tuple[Dict, ...]:
+        """Open positions, oldest first (a read-only snapshot; use add_position() to add)"""
+        return tuple(self._position_dict(i) for i in range(self._n_positions))
+    
+    @property
+    def trades(self) -> Tuple[Dict, ...]:
+        """Last TRADE_HISTORY_SIZE resolved positions, oldest first (a read-only snapshot)"""
+        trades = []
+        for t in range(max(0, self._n_trades - TRADE_HISTORY_SIZE), self._n_trades):
+            slot = t % TRADE_HISTORY_SIZE
+            position = self._position_dict(int(self._trades_position[slot]))
+            trades.append({
+                'market_id': position['market_id'],
+                'position': position,
+                'winning_side': position['side'],
+                'payout': float(self._trades_payout[slot]),
+                'profit': float(self._trades_profit[slot]),
+                'timestamp': _iso_timestamp(int(self._trades_timestamp_ns[slot]))
+            })
+        return tuple(trades)
+    
+    def _order_dict(self, i: int) -> Dict:
+        """Build the dict view of order row i"""
+        return {
+            'id': _format_order_id(int(self._orders_id[i])),
+            'market_id': self._orders_market_id[i],
+            'side': self._orders_side[i],
+            'price': float(self._orders_price[i]),
+            'size': float(self._orders_size[i]),
+            'cost': int(self._orders_cost_cents[i]) / CENTS_PER_DOLLAR,
+            'status': 'FILLED',  # In paper trading, assume immediate fill
+            'timestamp': _iso_timestamp(int(self._orders_timestamp_ns[i]))
+        }
+    
+    def _position_dict(self, i: int) -> Dict:
+        """Build the dict view of position row i"""
+        return {
+            'market_id': self._positions_market_id[i],
+            'side': self._positions_side[i],
+            'shares': float(self._positions_shares[i]),
+            'cost': float(self._positions_cost[i])
+        }
+    
+    @property
+    def markets_etag(self) -> Optional[str]:
+        """ETag of the last market page fetched by the real client"""
+        return getattr(self.real_client, 'markets_etag', None)
+    
+    def get_markets(
+        self, active: bool = True, if_none_match: Optional[str] = None
+    ) -> Optional[List[Dict]]:
         """
         Get markets from real API (read-only)
         In paper trading, we fetch real market data but simulate trades
+        
+        Returns None if the real client reports the list unchanged since if_none_match.
         """
         if self.real_client:
             try:
                 # Fetch real markets from API
-                markets = self.real_client.get_markets(active=active)
+                markets = self.real_client.get_markets(active=active, if_none_match=if_none_match)
+                if markets is None:
+                    return None
                 if markets:
-                    logger.debug(f"Fetched {len(markets)} markets from real API (paper trading mode)")
+                    logger.debug(
+                        "Fetched %d markets from real API (paper trading mode)", len(markets)
+                    )
+                    self._index_markets(markets)
                 else:
-                    logger.warning(f"Fetched 0 markets from real API (active={active})")
+                    logger.warning("Fetched 0 markets from real API (active=%s)", active)
                 return markets
             except Exception as e:
-                logger.error(f"Error fetching markets from real API: {e}", exc_info=True)
+                logger.error("Error fetching markets from real API: %s", e, exc_info=True)
                 return []
         else:
             logger.warning("No real API client available, returning empty market list")
             return []
     
+    async def get_markets_async(self, active: bool = True, pages: int = 1) -> List[Dict]:
+        """
+        Async variant of get_markets() (pages are fetched concurrently by the real client)
+        
+        Args:
+            active: Only return active markets
+            pages: Number of Gamma API pages to fetch
+        """
+        if not self.real_client:
+            logger.warning("No real API client available, returning empty market list")
+            return []
+        try:
+            markets = await self.real_client.get_markets_async(active=active, pages=pages)
+        except Exception as e:
+            logger.error("Error fetching markets from real API: %s", e, exc_info=True)
+            return []
+        if markets:
+            self._index_markets(markets)
+        return markets
+    
+    async def close_async(self):
+        """Close the real client's aiohttp session, if it opened one"""
+        if self.real_client is not None and hasattr(self.real_client, 'close_async'):
+            await self.real_client.close_async()
+    
+    def _index_markets(self, markets: List[Dict]):
+        """Index markets by id so get_market() can answer without the network"""
+        self.markets = {m.get('id') or m.get('condition_id'): m for m in markets}
+        self.markets.pop(None, None)
+        self._markets_indexed_at = time.monotonic()
+    
     def get_market(self, market_id: str) -> Optional[Dict]:
-        """Get market data from real API (read-only)"""
-        if self.real_client:
-            try:
-                return self.real_client.get_market(market_id)
-            except Exception as e:
-                logger.error(f"Error fetching market {market_id}: {e}")
-                return None
-        return self.markets.get(market_id)
+        """
+        Get market data (read-only)
+        
+        Markets seen by the last get_markets() call are returned straight from
+        self.markets; others come from the real API and are reused for
+        MARKET_DATA_TTL seconds.
+        """
+        market = self.markets.get(market_id)
+        if market is not None or not self.real_client:
+            return market
+        
+        market = self._market_cache.get(market_id)
+        if market is not None:
+            return market
+        try:
+            market = self.real_client.get_market(market_id)
+            if market:
+                self._market_cache.set(market_id, market)
+            return market
+        except Exception as e:
+            logger.error("Error fetching market %s: %s", market_id, e)
+            return None
     
     def get_market_prices(self, market_id: str) -> Optional[Dict]:
-        """Get current prices from real API (read-only)"""
-        if self.real_client:
-            try:
-                return self.real_client.get_market_prices(market_id)
-            except Exception as e:
-                logger.error(f"Error fetching prices for {market_id}: {e}")
-                return None
+        """
+        Get current prices (read-only)
         
-        # Fallback to mock if no real client
-        market = self.get_market(market_id)
-        if market:
+        With a real client, prices are never older than MARKET_DATA_TTL
+        seconds: they come from the last get_markets() list while it is that
+        fresh, and from the real API otherwise. Without one, they come from
+        self.markets. Returns None if the market has no prices.
+        """
+        market = self.markets.get(market_id)
+        if market is not None and 'yes_price' in market and 'no_price' in market and (
+            not self.real_client or time.monotonic() - self._markets_indexed_at < MARKET_DATA_TTL
+        ):
             return {
-                'yes_price': market.get('yes_price', 0.5),
-                'no_price': market.get('no_price', 0.5),
+                'yes_price': market['yes_price'],
+                'no_price': market['no_price'],
                 'market_id': market_id
             }
-        return None
+        if not self.real_client:
+            return None
+        
+        prices = self._prices_cache.get(market_id)
+        if prices is not None:
+            return prices
+        try:
+            prices = self.real_client.get_market_prices(market_id)
+            if prices:
+                self._prices_cache.set(market_id, prices)
+            return prices
+        except Exception as e:
+            logger.error("Error fetching prices for %s: %s", market_id, e)
+            return None
     
     def place_order(
         self,
@@ -115,41 +408,95 @@ class PaperTradingClient:
         
         Returns a mock order response
         """
-        cost = price * size
+        # Fixed-point cost (rounded to the nearest cent), so the balance never drifts
+        cost_cents = (
+            round(price * PRICE_SCALE) * round(size * SIZE_SCALE) + _COST_TO_CENTS // 2
+        ) // _COST_TO_CENTS
         
-        if cost > self.balance:
-            logger.warning(f"❌ Insufficient balance: Need ${cost:.2f}, have ${self.balance:.2f}")
+        if cost_cents > self._balance_cents:
+            logger.warning(
+                "❌ Insufficient balance: Need $%.2f, have $%.2f",
+                cost_cents / CENTS_PER_DOLLAR, self.balance
+            )
             return None
         
         # Simulate order
-        order = {
-            'id': f"paper_order_{len(self.orders)}",
-            'market_id': market_id,
-            'side': side,
-            'price': price,
-            'size': size,
-            'cost': cost,
-            'status': 'FILLED',  # In paper trading, assume immediate fill
-            'timestamp': datetime.now().isoformat()
-        }
+        i = self._n_orders
+        self._orders_price = _grow(self._orders_price, i)
+        self._orders_size = _grow(self._orders_size, i)
+        self._orders_cost_cents = _grow(self._orders_cost_cents, i)
+        self._orders_timestamp_ns = _grow(self._orders_timestamp_ns, i)
+        self._orders_id = _grow(self._orders_id, i)
+        self._orders_price[i] = price
+        self._orders_size[i] = size
+        self._orders_cost_cents[i] = cost_cents
+        self._orders_timestamp_ns[i] = _time_ns()
+        self._orders_id[i] = self._next_order_id
+        self._next_order_id += 1
+        self._orders_market_id.append(market_id)
+        self._orders_side.append(side)
+        self._n_orders = i + 1
         
-        self.orders.append(order)
-        self.balance -= cost
+        self._balance_cents -= cost_cents
         
-        logger.info(f"📝 PAPER TRADE: {side} {size:.2f} shares @ ${price:.4f} = ${cost:.2f}")
-        logger.info(f"   Remaining balance: ${self.balance:,.2f}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "📝 PAPER TRADE: %s %.2f shares @ $%.4f = $%.2f",
+                side, size, price, cost_cents / CENTS_PER_DOLLAR
+            )
+            logger.info(f"   Remaining balance: ${self.balance:,.2f}")
         
-        return order
+        return self._order_dict(i)
+    
+    async def place_order_async(
+        self,
+        market_id: str,
+        side: str,
+        price: float,
+        size: float,
+        order_type: str = "LIMIT"
+    ) -> Dict:
+        """Async variant of place_order() (simulated in-process, no I/O)"""
+        return self.place_order(market_id, side, price, size, order_type)
     
-    def cancel_order(self, order_id: str) -> bool:
-        """Simulate canceling an order"""
-        logger.info(f"📝 PAPER TRADE: Cancelled order {order_id}")
+    def cancel_order(self, order_id: Union[str, int]) -> bool:
+        """Simulate canceling an order (by its "paper_order_N" id or plain N)"""
+        if isinstance(order_id, int):
+            order_id = _format_order_id(order_id)
+        logger.info("📝 PAPER TRADE: Cancelled order %s", order_id)
         return True
     
+    async def cancel_order_async(self, order_id: Union[str, int]) -> bool:
+        """Async variant of cancel_order()"""
+        return self.cancel_order(order_id)
+    
     def get_balance(self) -> float:
         """Get current balance"""
         return self.balance
     
+    def add_position(self, market_id: str, side: str, shares: float, cost: float):
+        """
+        Record an open position
+        
+        Args:
+            market_id: Market the position is in
+            side: 'YES' or 'NO'
+            shares: Number of shares held
+            cost: Amount paid for them in USD
+        """
+        i = self._n_positions
+        self._positions_shares = _grow(self._positions_shares, i)
+        self._positions_cost = _grow(self._positions_cost, i)
+        self._positions_side_code = _grow(self._positions_side_code, i)
+        self._positions_shares[i] = shares
+        self._positions_cost[i] = cost
+        self._positions_total_cost += cost
+        self._positions_side_code[i] = SIDE_CODES.get(side, UNKNOWN_SIDE_CODE)
+        self._positions_market_id.append(market_id)
+        self._positions_side.append(side)
+        self._positions_by_market.setdefault(market_id, []).append(i)
+        self._n_positions = i + 1
+    
     def simulate_market_resolution(self, market_id: str, winning_side: str):
         """
         Simulate market resolution for paper trading
@@ -158,41 +505,55 @@ class PaperTradingClient:
             market_id: Market that resolved
             winning_side: 'YES' or 'NO'
         """
-        # Find all positions in this market
-        market_positions = [p for p in self.positions if p['market_id'] == market_id]
-        
-        for position in market_positions:
-            if position['side'] == winning_side:
-                # Winning position pays $1 per share
-                payout = position['shares'] * 1.0
-                profit = payout - position['cost']
-                self.balance += payout
-                
-                logger.info(f"📝 PAPER TRADE: Market {market_id} resolved - {winning_side} won")
-                logger.info(f"   Payout: ${payout:.2f}, Profit: ${profit:.2f}")
-                
-                # Record trade
-                trade = {
-                    'market_id': market_id,
-                    'position': position,
-                    'winning_side': winning_side,
-                    'payout': payout,
-                    'profit': profit,
-                    'timestamp': datetime.now().isoformat()
-                }
-                self.trades.append(trade)
+        rows = self._positions_by_market.get(market_id)
+        if not rows:
+            return
+        
+        # Find the winning positions in this market in one compiled pass
+        rows = np.array(rows, dtype=np.int64)
+        total_payout, total_profit, winning = resolve_kernel(
+            SIDE_CODES.get(winning_side, -1),
+            rows,
+            self._positions_side_code,
+            self._positions_shares,
+            self._positions_cost
+        )
+        winners = rows[winning]
+        if not winners.size:
+            return
+        self._balance_cents += _to_cents(total_payout)
+        
+        # Record trades: winning positions pay $1 per share
+        payouts = self._positions_shares[winners] * 1.0
+        profits = payouts - self._positions_cost[winners]
+        slots = (self._n_trades + np.arange(winners.size)) % TRADE_HISTORY_SIZE
+        self._trades_payout[slots] = payouts
+        self._trades_profit[slots] = profits
+        self._trades_position[slots] = winners
+        self._trades_timestamp_ns[slots] = _time_ns()
+        self._trades_total_payout += total_payout
+        self._trades_total_profit += total_profit
+        self._n_trades += winners.size
+        
+        if logger.isEnabledFor(logging.INFO):
+            for payout, profit in zip(payouts, profits):
+                logger.info(
+                    "📝 PAPER TRADE: Market %s resolved - %s won", market_id, winning_side
+                )
+                logger.info("   Payout: $%.2f, Profit: $%.2f", payout, profit)
     
     def get_statistics(self) -> Dict:
         """Get paper trading statistics"""
-        total_invested = sum(p['cost'] for p in self.positions)
-        total_payout = sum(t['payout'] for t in self.trades)
-        total_profit = sum(t['profit'] for t in self.trades)
+        # Running totals, kept up to date as positions and trades are recorded
+        total_invested = self._positions_total_cost
+        total_payout = self._trades_total_payout
+        total_profit = self._trades_total_profit
         
         return {
             'current_balance': self.balance,
-            'total_orders': len(self.orders),
-            'active_positions': len(self.positions),
-            'completed_trades': len(self.trades),
+            'total_orders': self._n_orders,
+            'active_positions': self._n_positions,
+            'completed_trades': self._n_trades,
             'total_invested': total_invested,
             'total_payout': total_payout,
             'total_profit': total_profit,
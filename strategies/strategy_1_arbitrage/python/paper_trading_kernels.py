@@ -0,0 +1,47 @@
+"""
+Paper Trading Kernels
+Compiled inner loops for the paper trading client (plain Python if numba isn't installed)
+"""
+import numpy as np
+
+from jit import njit
+
+
+@njit(cache=True, boundscheck=False)
+def resolve_kernel(
+    winning_code: int,
+    rows: np.ndarray,
+    side_codes: np.ndarray,
+    shares: np.ndarray,
+    costs: np.ndarray
+):
+    """
+    Find the winning positions of a resolved market and total their payout
+    
+    Only the given rows (the market's positions) are visited. A winning
+    position pays $1 per share. fastmath is off so the totals match summing
+    the positions one by one in Python.
+    
+    Args:
+        winning_code: Side code that won
+        rows: int64 position rows belonging to the resolved market
+        side_codes: int8 side code per position
+        shares: float64 shares per position
+        costs: float64 cost per position
+        
+    Returns:
+        Tuple of (total_payout, total_profit, winning mask aligned with rows)
+    """
+    winning = np.zeros(rows.shape[0], np.bool_)
+    total_payout = 0.0
+    total_profit = 0.0
+    for k in range(rows.shape[0]):
+        i = rows[k]
+        if side_codes[i] == winning_code:
+            winning[k] = True
+            payout = shares[i] * 1.0
+            total_payout += payout
+            total_profit += payout - costs[i]
+    
+    return total_payout, total_profit, winning
+
@@ -5,6 +5,7 @@ Run this before starting the bot to ensure everything is configured correctly
 """
 import os
 import sys
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # Add shared modules to path
@@ -19,14 +20,20 @@ if os.path.exists(shared_python_path) and shared_python_path not in sys.path:
 env_path = os.path.join(project_root, '.env')
 load_dotenv(dotenv_path=env_path)
 
+# Settings this script needs, read once (read-only)
+_ENV = MappingProxyType({
+    'api_key': os.getenv("POLYMARKET_API_KEY"),
+    'api_secret': os.getenv("POLYMARKET_API_SECRET"),
+})
+
 def test_connection():
     """Test PolyMarket API connection"""
     print("Testing PolyMarket API connection...")
     print("-" * 50)
     
     # Check environment variables
-    api_key = os.getenv("POLYMARKET_API_KEY")
-    api_secret = os.getenv("POLYMARKET_API_SECRET")
+    api_key = _ENV['api_key']
+    api_secret = _ENV['api_secret']
     
     if not api_key or not api_secret:
         print("❌ ERROR: API credentials not found!")
@@ -0,0 +1,16 @@
+"""
+Test path setup
+Puts the shared modules and the strategy 1 package on sys.path once, however
+many test modules import this
+"""
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for _path in (
+    os.path.join(_ROOT, 'shared', 'python'),
+    os.path.join(_ROOT, 'strategies', 'strategy_1_arbitrage', 'python'),
+):
+    if _path not in sys.path:
+        sys.path.append(_path)
@@ -2,24 +2,28 @@
 Unit tests for arbitrage detection
 """
 import unittest
-import sys
-import os
 
-# Add project to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared', 'python'))
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'strategies', 'strategy_1_arbitrage', 'python'))
+import numpy as np
 
+from tests import _bootstrap  # noqa: F401 - puts the modules under test on the path
+
+import detector_kernels
 from detector import ArbitrageDetector
 from paper_trading import PaperTradingClient
-from utils import calculate_profit_margin
+from utils import calculate_profit_margin, calculate_profit_margin_batch, MIN_PROFIT_THRESHOLD
 
 
 class TestArbitrageDetector(unittest.TestCase):
     """Test arbitrage detection logic"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Build the client once for the whole class"""
+        cls.client = PaperTradingClient()
+    
     def setUp(self):
         """Set up test fixtures"""
-        self.client = PaperTradingClient()
+        self.client.reset()
         self.detector = ArbitrageDetector(
             client=self.client,
             min_profit_pct=0.01,
@@ -38,8 +42,8 @@ class TestArbitrageDetector(unittest.TestCase):
         opportunity = self.detector.detect_arbitrage(market)
         
         self.assertIsNotNone(opportunity, "Should detect arbitrage opportunity")
-        self.assertTrue(opportunity['is_arbitrage'])
-        self.assertGreater(opportunity['profit_margin'], 0.01)
+        self.assertTrue(opportunity.is_arbitrage)
+        self.assertGreater(opportunity.profit_margin, 0.01)
     
     def test_no_arbitrage(self):
         """Test that non-arbitrage markets are rejected"""
@@ -67,6 +71,25 @@ class TestArbitrageDetector(unittest.TestCase):
         
         self.assertFalse(is_profitable)
     
+    def test_profit_margin_non_finite_prices(self):
+        """Test NaN and infinite prices are never profitable"""
+        for price in (float('nan'), float('inf'), float('-inf')):
+            self.assertEqual(calculate_profit_margin(price, 0.40, 0.02), (False, 0.0))
+            self.assertEqual(calculate_profit_margin(0.40, price, 0.02), (False, 0.0))
+    
+    def test_profit_margin_batch_matches_scalar(self):
+        """Test the batched margin calculation agrees with the scalar one"""
+        yes_prices = [0.40, 0.45, 0.60, 0.49, 0.0]
+        no_prices = [0.40, 0.50, 0.40, 0.48, 0.5]
+        
+        is_profitable, profit_margin = calculate_profit_margin_batch(yes_prices, no_prices, 0.02)
+        
+        for i, (yes_price, no_price) in enumerate(zip(yes_prices, no_prices)):
+            expected = calculate_profit_margin(yes_price, no_price, 0.02)
+            expected_profitable, expected_margin = expected
+            self.assertEqual(bool(is_profitable[i]), expected_profitable)
+            self.assertEqual(profit_margin[i], expected_margin)
+    
     def test_minimum_profit_threshold(self):
         """Test that minimum profit threshold is enforced"""
         # Very small arbitrage (below 1% threshold)
@@ -81,6 +104,68 @@ class TestArbitrageDetector(unittest.TestCase):
         
         # Should be rejected due to small profit margin
         self.assertIsNone(opportunity)
+    
+    def test_scan_matches_single_market_detection(self):
+        """Test scan_markets() and detect_arbitrage() agree, including on string prices"""
+        markets = [
+            {'id': 'good', 'yes_price': 0.40, 'no_price': 0.40},
+            {'id': 'string_prices', 'yes_price': '0.4', 'no_price': '0.4'},
+            {'id': 'no_arbitrage', 'yes_price': 0.60, 'no_price': 0.40},
+        ]
+        
+        scanned = [o.market_id for o in self.detector.scan_markets(markets)]
+        single = [m['id'] for m in markets if self.detector._detect_arbitrage_safe(m)]
+        
+        self.assertEqual(scanned, ['good'])
+        self.assertEqual(scanned, single)
+        with self.assertRaises(TypeError):
+            self.detector.detect_arbitrage(markets[1])
+    
+    def test_top_k_matches_full_sort(self):
+        """Test top_k keeps the same best-first order, ties included, as a full sort"""
+        prices = [
+            (0.40, 0.40), (0.45, 0.45), (0.40, 0.40), (0.30, 0.40), (0.45, 0.45), (0.60, 0.40)
+        ]
+        markets = [
+            {'id': f'market_{i}', 'yes_price': yes_price, 'no_price': no_price}
+            for i, (yes_price, no_price) in enumerate(prices)
+        ]
+        
+        full = [o.market_id for o in self.detector.scan_markets(markets)]
+        self.assertEqual(full, ['market_3', 'market_0', 'market_2', 'market_1', 'market_4'])
+        for top_k in range(len(markets) + 2):
+            top = [o.market_id for o in self.detector.scan_markets(markets, top_k=top_k)]
+            self.assertEqual(top, full[:top_k])
+            self.assertEqual(self.detector.last_match_count, len(full))
+    
+    def test_parallel_scan_matches_serial(self):
+        """Test the multi-threaded kernel (used for large lists) matches the serial one"""
+        n = detector_kernels.PARALLEL_SCAN_MIN_MARKETS * 4
+        rng = np.random.default_rng(0)
+        yes_prices = rng.uniform(0.0, 0.6, n).round(4)
+        no_prices = rng.uniform(0.0, 0.6, n).round(4)
+        
+        results = []
+        kernels = (detector_kernels.scan_kernel_into, detector_kernels.scan_kernel_into_parallel)
+        for kernel in kernels:
+            keep = np.empty(n, np.bool_)
+            margin = np.empty(n, np.float64)
+            kept = kernel(yes_prices, no_prices, 0.02, 0.01, MIN_PROFIT_THRESHOLD, keep, margin)
+            results.append((kept, keep, margin))
+        
+        serial, parallel = results
+        self.assertGreater(serial[0], 0)
+        self.assertEqual(parallel[0], serial[0])
+        np.testing.assert_array_equal(parallel[1], serial[1])
+        np.testing.assert_array_equal(parallel[2], serial[2])
+        
+        markets = [
+            {'id': f'market_{i}', 'yes_price': float(y), 'no_price': float(no)}
+            for i, (y, no) in enumerate(zip(yes_prices, no_prices))
+        ]
+        scanned = {o.market_id for o in self.detector.scan_markets(markets)}
+        expected = {m['id'] for m in markets if self.detector.detect_arbitrage(m)}
+        self.assertEqual(scanned, expected)
 
 
 if __name__ == '__main__':
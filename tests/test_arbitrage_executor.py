@@ -1,13 +1,12 @@
 """
 Unit tests for arbitrage execution
 """
+import asyncio
 import unittest
-import sys
-import os
 
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared', 'python'))
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'strategies', 'strategy_1_arbitrage', 'python'))
+from tests import _bootstrap  # noqa: F401 - puts the modules under test on the path
 
+from detector import Opportunity
 from executor import ArbitrageExecutor
 from paper_trading import PaperTradingClient
 
@@ -15,9 +14,14 @@ from paper_trading import PaperTradingClient
 class TestArbitrageExecutor(unittest.TestCase):
     """Test arbitrage execution logic"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Build the client once for the whole class"""
+        cls.client = PaperTradingClient(initial_balance=10000.0)
+    
     def setUp(self):
         """Set up test fixtures"""
-        self.client = PaperTradingClient(initial_balance=10000.0)
+        self.client.reset()
         self.executor = ArbitrageExecutor(
             client=self.client,
             max_position_size=1000.0,
@@ -26,11 +30,15 @@ class TestArbitrageExecutor(unittest.TestCase):
     
     def test_position_sizing(self):
         """Test position size calculation"""
-        opportunity = {
-            'market_id': 'test_market',
-            'profit_margin': 0.02,  # 2% profit
-            'total_cost': 0.98
-        }
+        opportunity = Opportunity(
+            market_id='test_market',
+            market_description='Test market',
+            yes_price=0.52,
+            no_price=0.46,
+            total_cost=0.98,
+            profit_margin=0.02,  # 2% profit
+            shares_per_dollar=1.0 / 0.98
+        )
         
         position_size = self.executor.calculate_position_size(opportunity, 10000.0)
         
@@ -39,39 +47,60 @@ class TestArbitrageExecutor(unittest.TestCase):
     
     def test_execute_arbitrage(self):
         """Test arbitrage execution"""
-        opportunity = {
-            'market_id': 'test_market',
-            'market_description': 'Test market',
-            'yes_price': 0.52,
-            'no_price': 0.46,
-            'total_cost': 0.98,
-            'profit_margin': 0.02,
-            'shares_per_dollar': 1.0 / 0.98
-        }
+        opportunity = Opportunity(
+            market_id='test_market',
+            market_description='Test market',
+            yes_price=0.52,
+            no_price=0.46,
+            total_cost=0.98,
+            profit_margin=0.02,
+            shares_per_dollar=1.0 / 0.98
+        )
         
-        result = self.executor.execute_arbitrage(opportunity)
+        result = asyncio.run(self.executor.execute_arbitrage(opportunity))
         
         self.assertIsNotNone(result)
         self.assertEqual(result['market_id'], 'test_market')
         self.assertIn('yes_order_id', result)
         self.assertIn('no_order_id', result)
     
+    def test_balance_cache(self):
+        """Test the balance is fetched once and tracked locally after fills"""
+        opportunity = Opportunity(
+            market_id='test_market',
+            market_description='Test market',
+            yes_price=0.52,
+            no_price=0.46,
+            total_cost=0.98,
+            profit_margin=0.02,
+            shares_per_dollar=1.0 / 0.98
+        )
+        
+        result = asyncio.run(self.executor.execute_arbitrage(opportunity))
+        
+        # Later balance changes on the client are not seen until the TTL expires
+        self.client.balance = 50.0
+        self.assertEqual(self.executor._get_cached_balance(), 10000.0 - result['position_size'])
+        
+        self.executor._balance_cache = None
+        self.assertEqual(self.executor._get_cached_balance(), 50.0)
+    
     def test_insufficient_balance(self):
         """Test execution with insufficient balance"""
         # Set very low balance
         self.client.balance = 50.0
         
-        opportunity = {
-            'market_id': 'test_market',
-            'market_description': 'Test market',
-            'yes_price': 0.52,
-            'no_price': 0.46,
-            'total_cost': 0.98,
-            'profit_margin': 0.02,
-            'shares_per_dollar': 1.0 / 0.98
-        }
+        opportunity = Opportunity(
+            market_id='test_market',
+            market_description='Test market',
+            yes_price=0.52,
+            no_price=0.46,
+            total_cost=0.98,
+            profit_margin=0.02,
+            shares_per_dollar=1.0 / 0.98
+        )
         
-        result = self.executor.execute_arbitrage(opportunity)
+        result = asyncio.run(self.executor.execute_arbitrage(opportunity))
         
         # Should return None due to insufficient balance
         self.assertIsNone(result)
@@ -0,0 +1,95 @@
+"""
+Unit tests for caching helpers
+"""
+import unittest
+import tempfile
+import time
+
+from tests import _bootstrap  # noqa: F401 - puts the modules under test on the path
+
+from cache import FileCache, MarketCache, TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test in-process TTL cache"""
+    
+    def test_get_and_set(self):
+        """Test cached values are returned until they expire"""
+        cache = TTLCache(maxsize=4, ttl=0.05)
+        cache.set('market_1', {'id': 'market_1'})
+        
+        self.assertEqual(cache.get('market_1'), {'id': 'market_1'})
+        
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('market_1'))
+    
+    def test_invalidate(self):
+        """Test invalidating one key or the whole cache"""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        
+        cache.invalidate('a')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+        
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+    
+    def test_maxsize_evicts_oldest(self):
+        """Test the oldest entry is evicted when full"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+        
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+
+class TestMarketCache(unittest.TestCase):
+    """Test scan-loop market list cache"""
+    
+    def test_ttl_and_etag(self):
+        """Test the list is served until it expires, while the ETag is kept"""
+        cache = MarketCache(ttl=0.05)
+        self.assertIsNone(cache.get())
+        
+        cache.put([{'id': '1'}], etag='"v1"')
+        self.assertEqual(cache.get(), [{'id': '1'}])
+        
+        time.sleep(0.06)
+        self.assertIsNone(cache.get())
+        self.assertEqual(cache.etag, '"v1"')
+        self.assertEqual(cache.markets, [{'id': '1'}])
+
+
+class TestFileCache(unittest.TestCase):
+    """Test on-disk JSON cache"""
+    
+    def setUp(self):
+        """Set up a temporary cache directory"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+    
+    def test_round_trip(self):
+        """Test values survive a new cache instance (i.e. a restart)"""
+        FileCache(self.tmp_dir.name, ttl=60).set('markets?limit=500', [{'id': '1'}])
+        
+        value, fresh = FileCache(self.tmp_dir.name, ttl=60).get('markets?limit=500')
+        
+        self.assertEqual(value, [{'id': '1'}])
+        self.assertTrue(fresh)
+    
+    def test_stale_and_missing(self):
+        """Test stale entries are flagged and missing keys return None"""
+        cache = FileCache(self.tmp_dir.name, ttl=0)
+        cache.set('key', {'a': 1})
+        
+        self.assertEqual(cache.get('key'), ({'a': 1}, False))
+        self.assertEqual(cache.get('missing'), (None, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
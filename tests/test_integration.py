@@ -3,14 +3,13 @@ Integration tests for Strategy 1
 Tests the full bot workflow end-to-end
 """
 import unittest
-import sys
-import os
 import asyncio
+import time
 
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared', 'python'))
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'strategies', 'strategy_1_arbitrage', 'python'))
+from tests import _bootstrap  # noqa: F401 - puts the modules under test on the path
 
 from bot import ArbitrageBot
+from detector import ArbitrageDetector, Opportunity
 from paper_trading import PaperTradingClient
 
 
@@ -48,10 +47,107 @@ class TestIntegration(unittest.TestCase):
         self.assertIsNotNone(opportunity)
         
         # Execute
-        result = executor.execute_arbitrage(opportunity)
+        result = asyncio.run(executor.execute_arbitrage(opportunity))
         self.assertIsNotNone(result)
 
 
+
+class BlockingExecutor:
+    """Executor stand-in that records opportunities and holds each one until released"""
+    
+    def __init__(self):
+        """Start with nothing executed and the gate closed"""
+        self.executed = []
+        self.release = asyncio.Event()
+    
+    async def execute_arbitrage(self, opportunity):
+        """Record the opportunity, then wait for release"""
+        self.executed.append(opportunity.market_id)
+        await self.release.wait()
+        return None
+
+
+class TestOpportunityQueue(unittest.TestCase):
+    """Test the queue between the scan loop and the executor task"""
+    
+    @staticmethod
+    def _opportunity(market_id):
+        """Build a profitable opportunity for market_id"""
+        return Opportunity(market_id, 'Test market', 0.4, 0.4, 0.8, 0.184, 1.25)
+    
+    def _start(self, bot, maxsize):
+        """Give the bot a blocking executor, a queue and a running executor task"""
+        bot.executor = BlockingExecutor()
+        bot._opp_queue = asyncio.Queue(maxsize=maxsize)
+        bot._executor_task = asyncio.create_task(bot._run_executor())
+        return bot.executor
+    
+    def test_full_queue_drops_new_opportunities(self):
+        """Test opportunities found while the queue is full are dropped, the rest run in order"""
+        async def scenario():
+            bot = ArbitrageBot(paper_trading=True)
+            executor = self._start(bot, maxsize=2)
+            
+            bot._queue_opportunity(self._opportunity('market_0'))
+            await asyncio.sleep(0)  # market_0 is now in flight
+            for i in range(1, 5):
+                bot._queue_opportunity(self._opportunity(f'market_{i}'))
+            
+            executor.release.set()
+            await bot._opp_queue.join()
+            await bot._stop_executor()
+            return executor.executed
+        
+        self.assertEqual(asyncio.run(scenario()), ['market_0', 'market_1', 'market_2'])
+    
+    def test_stop_drops_queued_and_finishes_in_flight(self):
+        """Test shutdown lets the running execution finish but skips queued ones"""
+        async def scenario():
+            bot = ArbitrageBot(paper_trading=True)
+            executor = self._start(bot, maxsize=4)
+            
+            for i in range(3):
+                bot._queue_opportunity(self._opportunity(f'market_{i}'))
+            await asyncio.sleep(0)
+            
+            stop = asyncio.create_task(bot._stop_executor())
+            await asyncio.sleep(0)
+            executor.release.set()
+            await stop
+            return executor.executed, bot._executor_task
+        
+        executed, task = asyncio.run(scenario())
+        self.assertEqual(executed, ['market_0'])
+        self.assertTrue(task.done())
+
+
+
+class TestShutdown(unittest.TestCase):
+    """Test the scan loop reacts to shutdown requests"""
+    
+    def test_shutdown_cuts_the_poll_wait_short(self):
+        """Test a shutdown request ends the wait between scans instead of sleeping it out"""
+        async def scenario():
+            bot = ArbitrageBot(paper_trading=True)
+            bot.scan_interval = 30.0
+            bot.stream_prices = False
+            bot.detector = ArbitrageDetector(client=PaperTradingClient())
+            bot._fetch_markets = lambda: [{'id': 'market_1', 'yes_price': 0.6, 'no_price': 0.4}]
+            
+            scan = asyncio.create_task(bot.scan_for_arbitrage())
+            await asyncio.sleep(0.1)
+            started = time.monotonic()
+            bot._request_shutdown()
+            await scan
+            if bot._next_fetch is not None:
+                bot._next_fetch.cancel()
+            return time.monotonic() - started, bot.stats['scans']
+        
+        elapsed, scans = asyncio.run(scenario())
+        self.assertEqual(scans, 1)
+        self.assertLess(elapsed, 1.0)
+
+
 if __name__ == '__main__':
     unittest.main()
 
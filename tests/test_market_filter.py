@@ -0,0 +1,55 @@
+"""
+Unit tests for the active-market filter
+"""
+import time
+import unittest
+
+from tests import _bootstrap  # noqa: F401 - puts the modules under test on the path
+
+from market_filter import is_tradeable
+import polymarket_client
+
+
+CONDITION_ID = '0x' + 'ab' * 32
+
+
+@unittest.skipUnless(polymarket_client.PANDAS_AVAILABLE, "pandas not installed")
+class TestVectorizedFilter(unittest.TestCase):
+    """Test the pandas filter agrees with is_tradeable()"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.now_ts = time.time()
+        self.one_year_ago_ts = self.now_ts - 365 * 24 * 3600
+    
+    def assertMatchesScalar(self, markets):
+        """Assert the vectorized mask equals is_tradeable() per market"""
+        expected = [is_tradeable(m, self.now_ts, self.one_year_ago_ts) for m in markets]
+        mask = polymarket_client._tradeable_mask(markets, self.now_ts, self.one_year_ago_ts)
+        self.assertEqual(mask, expected)
+    
+    def test_mixed_markets(self):
+        """Test expired, old, archived and malformed markets are filtered the same way"""
+        self.assertMatchesScalar([
+            {'condition_id': CONDITION_ID, 'active': True},
+            {'condition_id': CONDITION_ID, 'active': True, 'end_date_iso': '2000-01-01T00:00:00Z'},
+            {'condition_id': CONDITION_ID, 'active': True, 'createdAt': '2000-01-01T00:00:00Z'},
+            {'condition_id': CONDITION_ID, 'active': True, 'archived': True},
+            {'condition_id': CONDITION_ID, 'active': True, 'end_date_iso': 'not a date'},
+            {'condition_id': '0x123', 'accepting_orders': True},
+        ])
+    
+    def test_non_string_columns(self):
+        """Test columns without any strings are ignored rather than raising"""
+        self.assertMatchesScalar([
+            {'condition_id': CONDITION_ID, 'active': True, 'end_date_iso': 1700000000},
+            {'condition_id': CONDITION_ID, 'active': True, 'end_date_iso': None},
+        ])
+        self.assertMatchesScalar([
+            {'condition_id': None, 'active': True},
+            {'condition_id': 12, 'active': True},
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
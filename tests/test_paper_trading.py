@@ -0,0 +1,150 @@
+"""
+Unit tests for the paper trading client
+"""
+import unittest
+
+from tests import _bootstrap  # noqa: F401 - puts the modules under test on the path
+
+import paper_trading
+from paper_trading import PaperTradingClient
+
+
+class TestPaperTradingClient(unittest.TestCase):
+    """Test simulated orders, positions and statistics"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Build the client once for the whole class"""
+        cls.client = PaperTradingClient(initial_balance=10000.0)
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.client.reset()
+    
+    def test_place_order(self):
+        """Test orders are recorded and charged to the balance"""
+        order = self.client.place_order('market_1', 'BUY', price=0.5, size=100.0)
+        
+        self.assertEqual(order['id'], 'paper_order_0')
+        self.assertEqual(order['cost'], 50.0)
+        self.assertEqual(self.client.get_balance(), 9950.0)
+        self.assertEqual(self.client.orders, (order,))
+    
+    def test_views_are_read_only(self):
+        """Test the orders/positions/trades views can't be appended to by mistake"""
+        for view in (self.client.orders, self.client.positions, self.client.trades):
+            with self.assertRaises(AttributeError):
+                view.append({})
+    
+    def test_balance_does_not_drift(self):
+        """Test many small orders leave an exact balance (money is kept in cents)"""
+        for _ in range(1000):
+            self.client.place_order('market_1', 'BUY', price=0.1, size=1.0)
+        
+        self.assertEqual(self.client.get_balance(), 9900.0)
+    
+    def test_orders_grow_past_initial_capacity(self):
+        """Test the order columns grow when full"""
+        n = paper_trading.INITIAL_CAPACITY + 5
+        for i in range(n):
+            self.client.place_order(f'market_{i}', 'BUY', price=0.01, size=1.0)
+        
+        orders = self.client.orders
+        self.assertEqual(len(orders), n)
+        self.assertEqual(orders[-1]['market_id'], f'market_{n - 1}')
+        self.assertEqual(self.client.get_statistics()['total_orders'], n)
+    
+    def test_market_resolution_statistics(self):
+        """Test winning positions pay out and show up in the statistics"""
+        self.client.add_position('market_1', 'YES', shares=100.0, cost=45.0)
+        self.client.add_position('market_1', 'NO', shares=100.0, cost=50.0)
+        self.client.add_position('market_2', 'YES', shares=10.0, cost=5.0)
+        
+        self.client.simulate_market_resolution('market_1', 'YES')
+        stats = self.client.get_statistics()
+        
+        self.assertEqual(self.client.get_balance(), 10100.0)
+        self.assertEqual(stats['active_positions'], 3)
+        self.assertEqual(stats['completed_trades'], 1)
+        self.assertEqual(stats['total_invested'], 100.0)
+        self.assertEqual(stats['total_payout'], 100.0)
+        self.assertEqual(stats['total_profit'], 55.0)
+        self.assertEqual(self.client.trades[0]['position']['side'], 'YES')
+    
+    def test_trade_history_wraps(self):
+        """Test only the newest trades are kept, while totals count them all"""
+        original_size = paper_trading.TRADE_HISTORY_SIZE
+        paper_trading.TRADE_HISTORY_SIZE = 2
+        self.addCleanup(setattr, paper_trading, 'TRADE_HISTORY_SIZE', original_size)
+        client = PaperTradingClient()
+        
+        for i in range(3):
+            client.add_position(f'market_{i}', 'YES', shares=10.0, cost=5.0)
+            client.simulate_market_resolution(f'market_{i}', 'YES')
+        
+        self.assertEqual([t['market_id'] for t in client.trades], ['market_1', 'market_2'])
+        self.assertEqual(client.get_statistics()['completed_trades'], 3)
+        self.assertEqual(client.get_statistics()['total_profit'], 15.0)
+    
+    def test_market_prices_cached(self):
+        """Test repeated price lookups reuse the real client's answer within the TTL"""
+        calls = []
+        
+        class FakeRealClient:
+            def get_market_prices(self, market_id):
+                calls.append(market_id)
+                return {'yes_price': 0.4, 'no_price': 0.5, 'market_id': market_id}
+        
+        client = PaperTradingClient(real_client=FakeRealClient())
+        first = client.get_market_prices('market_1')
+        second = client.get_market_prices('market_1')
+        
+        self.assertEqual(first, second)
+        self.assertEqual(calls, ['market_1'])
+    
+    def test_get_market_uses_listed_markets(self):
+        """Test markets returned by get_markets() are looked up without the network"""
+        class FakeRealClient:
+            def get_markets(self, active=True, if_none_match=None):
+                return [{'condition_id': '0xabc', 'yes_price': 0.4, 'no_price': 0.5}]
+            
+            def get_market(self, market_id):
+                raise AssertionError("get_market should not hit the real client")
+        
+        client = PaperTradingClient(real_client=FakeRealClient())
+        client.get_markets()
+        
+        self.assertEqual(client.get_market('0xabc')['yes_price'], 0.4)
+    
+    def test_listed_prices_expire(self):
+        """Test listed prices are only reused for MARKET_DATA_TTL, then asked for again"""
+        calls = []
+        
+        class FakeRealClient:
+            def get_markets(self, active=True, if_none_match=None):
+                return [{'id': 'market_1', 'yes_price': 0.4, 'no_price': 0.5}]
+            
+            def get_market_prices(self, market_id):
+                calls.append(market_id)
+                return {'yes_price': 0.3, 'no_price': 0.6, 'market_id': market_id}
+        
+        client = PaperTradingClient(real_client=FakeRealClient())
+        client.get_markets()
+        self.assertEqual(client.get_market_prices('market_1')['yes_price'], 0.4)
+        self.assertEqual(calls, [])
+        
+        original_ttl = paper_trading.MARKET_DATA_TTL
+        paper_trading.MARKET_DATA_TTL = 0.0
+        self.addCleanup(setattr, paper_trading, 'MARKET_DATA_TTL', original_ttl)
+        self.assertEqual(client.get_market_prices('market_1')['yes_price'], 0.3)
+        self.assertEqual(calls, ['market_1'])
+    
+    def test_mock_market_without_prices(self):
+        """Test a mock market with no prices reports none instead of made-up ones"""
+        self.client.markets['market_1'] = {'id': 'market_1'}
+        
+        self.assertIsNone(self.client.get_market_prices('market_1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
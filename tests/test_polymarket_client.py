@@ -0,0 +1,315 @@
+"""
+Unit tests for the PolyMarket client (network calls are stubbed)
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from tests import _bootstrap  # noqa: F401 - puts the modules under test on the path
+
+import polymarket_client
+from polymarket_client import PolyMarketClient
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+    
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b''
+        self.headers = headers or {}
+
+
+class ClientTestCase(unittest.TestCase):
+    """Build a client with dummy credentials, a temp cache dir and a stubbed _request"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        env = mock.patch.dict(os.environ, {
+            'POLYMARKET_API_KEY': 'test-key',
+            'POLYMARKET_API_SECRET': 'test-secret',
+            'CACHE_DIR': tmp_dir.name,
+            'GAMMA_API_LIMIT': '500',
+        })
+        env.start()
+        self.addCleanup(env.stop)
+        
+        self.client = PolyMarketClient(validate_order_books=False, rate_limit_per_s=0)
+        self.requests = []
+        self.responses = {}
+        self._lock = threading.Lock()
+        self.client._request = self._request
+    
+    def _request(self, method, url, **kwargs):
+        """Record the request and answer from self.responses[(method, url)]"""
+        with self._lock:
+            self.requests.append((method, url, kwargs))
+        response = self.responses[(method, url)]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class TestOrderBookValidation(ClientTestCase):
+    """Test order book validation via POST /books and the HEAD fallback"""
+    
+    markets = [{'condition_id': cid} for cid in ('book_1', 'book_2', 'book_3')]
+    
+    @staticmethod
+    def _head_url(condition_id):
+        """URL of the single-book HEAD request for condition_id"""
+        return f'{polymarket_client.CLOB_BOOK_URL}?token_id={condition_id}'
+    
+    def test_bulk_books_response(self):
+        """Test books with bids or asks are kept; empty and missing books are dropped"""
+        self.responses[('POST', polymarket_client.CLOB_BOOKS_URL)] = FakeResponse(200, [
+            {'asset_id': 'book_1', 'bids': [{'price': '0.4', 'size': '10'}], 'asks': []},
+            {'asset_id': 'book_2', 'bids': [], 'asks': []},
+        ])
+        
+        valid = self.client._validate_order_books(self.markets)
+        
+        self.assertEqual([m['condition_id'] for m in valid], ['book_1'])
+        self.assertEqual([r[0] for r in self.requests], ['POST'])
+        self.assertEqual(
+            self.requests[0][2]['json'],
+            [{'token_id': 'book_1'}, {'token_id': 'book_2'}, {'token_id': 'book_3'}]
+        )
+    
+    def test_results_are_reused(self):
+        """Test checked markets aren't looked up again while their result is fresh"""
+        self.responses[('POST', polymarket_client.CLOB_BOOKS_URL)] = FakeResponse(200, [
+            {'asset_id': 'book_1', 'asks': [{'price': '0.6', 'size': '10'}]},
+        ])
+        self.client._validate_order_books(self.markets)
+        
+        valid = self.client._validate_order_books(self.markets)
+        
+        self.assertEqual([m['condition_id'] for m in valid], ['book_1'])
+        self.assertEqual(len(self.requests), 1)
+    
+    def test_head_fallback(self):
+        """Test a failed bulk lookup falls back to HEAD; unreachable books are kept"""
+        self.responses[('POST', polymarket_client.CLOB_BOOKS_URL)] = FakeResponse(500)
+        self.responses[('HEAD', self._head_url('book_1'))] = FakeResponse(200)
+        self.responses[('HEAD', self._head_url('book_2'))] = FakeResponse(404)
+        self.responses[('HEAD', self._head_url('book_3'))] = ConnectionError("network down")
+        
+        valid = self.client._validate_order_books(self.markets)
+        
+        self.assertEqual([m['condition_id'] for m in valid], ['book_1', 'book_3'])
+        self.assertEqual(sorted(r[0] for r in self.requests), ['HEAD', 'HEAD', 'HEAD', 'POST'])
+    
+    def test_unexpected_books_payload(self):
+        """Test a non-list POST /books body is treated as a failed bulk lookup"""
+        books_url = polymarket_client.CLOB_BOOKS_URL
+        self.responses[('POST', books_url)] = FakeResponse(200, {'error': 'x'})
+        for condition_id in ('book_1', 'book_2', 'book_3'):
+            self.responses[('HEAD', self._head_url(condition_id))] = FakeResponse(404)
+        
+        self.assertEqual(self.client._validate_order_books(self.markets), [])
+
+
+class FakeClock:
+    """Stand-in for the time module whose sleep() just advances monotonic()"""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        """Current fake time"""
+        return self.now
+    
+    def sleep(self, seconds):
+        """Record the sleep and advance the clock"""
+        self.sleeps.append(seconds)
+        self.now += seconds
+    
+    async def async_sleep(self, seconds):
+        """Awaitable sleep() for patching asyncio.sleep"""
+        self.sleep(seconds)
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test the request rate limiter"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.clock = FakeClock()
+        patcher = mock.patch.object(polymarket_client, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_burst_then_wait(self):
+        """Test the burst is served at once and the next request has to wait"""
+        bucket = polymarket_client._TokenBucket(rate=10, burst=2)
+        
+        self.assertEqual(bucket._take(), 0.0)
+        self.assertEqual(bucket._take(), 0.0)
+        self.assertAlmostEqual(bucket._take(), 0.1)
+    
+    def test_refill(self):
+        """Test tokens refill at `rate` per second and never above the burst"""
+        bucket = polymarket_client._TokenBucket(rate=4, burst=2)
+        bucket._take()
+        bucket._take()
+        
+        self.clock.now += 0.125
+        self.assertAlmostEqual(bucket._take(), 0.125)
+        self.clock.now += 0.125
+        self.assertEqual(bucket._take(), 0.0)
+        
+        self.clock.now += 60
+        self.assertEqual(bucket._take(), 0.0)
+        self.assertEqual(bucket._take(), 0.0)
+        self.assertGreater(bucket._take(), 0.0)
+    
+    def test_acquire_blocks_until_refilled(self):
+        """Test acquire() sleeps just long enough for the next token"""
+        bucket = polymarket_client._TokenBucket(rate=4, burst=1)
+        
+        bucket.acquire()
+        bucket.acquire()
+        bucket.acquire()
+        
+        self.assertAlmostEqual(sum(self.clock.sleeps), 0.5)
+        self.assertAlmostEqual(self.clock.now, 1000.5)
+    
+    def test_acquire_async_waits(self):
+        """Test acquire_async() waits on the event loop instead of blocking"""
+        bucket = polymarket_client._TokenBucket(rate=4, burst=1)
+        
+        with mock.patch.object(asyncio, 'sleep', self.clock.async_sleep):
+            asyncio.run(self._acquire_async(bucket, 3))
+        
+        self.assertAlmostEqual(sum(self.clock.sleeps), 0.5)
+    
+    @staticmethod
+    async def _acquire_async(bucket, n):
+        """Acquire n tokens from an event loop"""
+        for _ in range(n):
+            await bucket.acquire_async()
+    
+    def test_non_positive_rate_disables_limiting(self):
+        """Test a rate of zero never waits"""
+        bucket = polymarket_client._TokenBucket(rate=0, burst=1)
+        
+        for _ in range(10):
+            bucket.acquire()
+        
+        self.assertEqual(self.clock.sleeps, [])
+
+
+class TestConditionalMarketsFetch(ClientTestCase):
+    """Test get_markets() conditional GETs with If-None-Match"""
+    
+    markets_url = 'https://gamma-api.polymarket.com/markets?limit=500'
+    raw_markets = [{'conditionId': 'market_1', 'slug': 'market-1', 'active': True}]
+    
+    def test_etag_recorded(self):
+        """Test a plain fetch sends no conditional header and records the ETag"""
+        self.responses[('GET', self.markets_url)] = FakeResponse(
+            200, self.raw_markets, headers={'ETag': '"v1"'}
+        )
+        
+        markets = self.client.get_markets(active=False)
+        
+        self.assertEqual([m['condition_id'] for m in markets], ['market_1'])
+        self.assertEqual(self.client.markets_etag, '"v1"')
+        self.assertIsNone(self.requests[0][2]['headers'])
+    
+    def test_not_modified_returns_none(self):
+        """Test a 304 answer to If-None-Match returns None, bypassing the result cache"""
+        self.responses[('GET', self.markets_url)] = FakeResponse(
+            200, self.raw_markets, headers={'ETag': '"v1"'}
+        )
+        self.client.get_markets(active=False)
+        self.responses[('GET', self.markets_url)] = FakeResponse(304)
+        
+        self.assertIsNone(self.client.get_markets(active=False, if_none_match='"v1"'))
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[1][2]['headers'], {'If-None-Match': '"v1"'})
+        
+        # Unconditional calls are still served from the cache
+        self.assertEqual(len(self.client.get_markets(active=False)), 1)
+        self.assertEqual(len(self.requests), 2)
+    
+    def test_modified_returns_markets(self):
+        """Test a 200 answer to If-None-Match returns the new list and ETag"""
+        self.responses[('GET', self.markets_url)] = FakeResponse(
+            200, self.raw_markets * 2, headers={'ETag': '"v2"'}
+        )
+        
+        markets = self.client.get_markets(active=False, if_none_match='"v1"')
+        
+        self.assertEqual(len(markets), 2)
+        self.assertEqual(self.client.markets_etag, '"v2"')
+
+
+class TestPriceEvents(unittest.TestCase):
+    """Test parsing of market channel websocket frames"""
+    
+    @staticmethod
+    def parse(events):
+        """Collect the (token_id, best ask) pairs parsed from events"""
+        return list(PolyMarketClient._parse_price_events(events))
+    
+    def test_book_snapshot(self):
+        """Test a book snapshot yields its lowest ask"""
+        event = {
+            'event_type': 'book',
+            'asset_id': 'token_1',
+            'asks': [{'price': '0.55', 'size': '5'}, {'price': '0.52', 'size': '1'}],
+            'bids': [{'price': '0.50', 'size': '3'}],
+        }
+        
+        self.assertEqual(self.parse(event), [('token_1', 0.52)])
+        self.assertEqual(self.parse([dict(event, asks=[])]), [])
+    
+    def test_price_change(self):
+        """Test each price change with a best ask is yielded"""
+        event = {
+            'event_type': 'price_change',
+            'price_changes': [
+                {'asset_id': 'token_1', 'best_ask': '0.48'},
+                {'asset_id': 'token_2', 'best_ask': ''},
+                {'asset_id': 'token_3', 'best_ask': '0.51'},
+            ],
+        }
+        
+        self.assertEqual(self.parse([event]), [('token_1', 0.48), ('token_3', 0.51)])
+    
+    def test_other_frames_ignored(self):
+        """Test other event types, non-dict entries and non-list frames are skipped"""
+        events = [
+            {'event_type': 'last_trade_price', 'asset_id': 'token_1', 'price': '0.5'},
+            {'event_type': 'tick_size_change', 'asset_id': 'token_1'},
+            'PONG',
+            None,
+        ]
+        
+        self.assertEqual(self.parse(events), [])
+        self.assertEqual(self.parse('PONG'), [])
+        self.assertEqual(self.parse(None), [])
+    
+    def test_malformed_events_skipped(self):
+        """Test malformed events are skipped without dropping the rest of the frame"""
+        events = [
+            {'event_type': 'book', 'asks': [{'price': '0.5'}]},
+            {'event_type': 'book', 'asset_id': 'token_1', 'asks': [{'price': 'n/a'}]},
+            {'event_type': 'price_change', 'price_changes': [{'best_ask': '0.4'}]},
+            {'event_type': 'book', 'asset_id': 'token_2', 'asks': [{'price': '0.45'}]},
+        ]
+        
+        self.assertEqual(self.parse(events), [('token_2', 0.45)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Unit tests for the trade log
+"""
+import unittest
+import os
+import json
+import tempfile
+from datetime import datetime
+
+from tests import _bootstrap  # noqa: F401 - puts the modules under test on the path
+
+from utils import log_trade, load_trades
+
+
+class TestTradeLog(unittest.TestCase):
+    """Test log_trade() / load_trades() round trips"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+    
+    def test_jsonl_log(self):
+        """Test trades are appended one per line"""
+        log_file = os.path.join(self.tmp_dir.name, 'trades.jsonl')
+        for i in range(3):
+            log_trade({'market_id': f'market_{i}'}, log_file)
+        
+        trades = list(load_trades(log_file))
+        
+        self.assertEqual([t['market_id'] for t in trades], ['market_0', 'market_1', 'market_2'])
+        self.assertIn('timestamp', trades[0])
+    
+    def test_json_array_log(self):
+        """Test a .json log stays a valid JSON array, including pre-existing files"""
+        log_file = os.path.join(self.tmp_dir.name, 'trades.json')
+        with open(log_file, 'w') as f:
+            json.dump([{'market_id': 'old'}], f, indent=2)
+        
+        log_trade({'market_id': 'new_1'}, log_file)
+        log_trade({'market_id': 'new_2'}, log_file)
+        
+        with open(log_file, 'r') as f:
+            trades = json.load(f)
+        
+        self.assertEqual([t['market_id'] for t in trades], ['old', 'new_1', 'new_2'])
+    
+    def test_timestamp_ns_uses_local_time(self):
+        """Test trades stamped with timestamp_ns get the same local ISO format as the rest"""
+        log_file = os.path.join(self.tmp_dir.name, 'trades.jsonl')
+        timestamp_ns = 1_700_000_000_123_456_789
+        log_trade({'market_id': 'stamped', 'timestamp_ns': timestamp_ns}, log_file)
+        log_trade({'market_id': 'unstamped'}, log_file)
+        
+        stamped, unstamped = load_trades(log_file)
+        
+        expected = datetime.fromtimestamp(1_700_000_000).replace(microsecond=123456)
+        self.assertEqual(stamped['timestamp'], expected.isoformat())
+        self.assertIsNone(datetime.fromisoformat(stamped['timestamp']).tzinfo)
+        self.assertIsNone(datetime.fromisoformat(unstamped['timestamp']).tzinfo)
+
+
+if __name__ == '__main__':
+    unittest.main()